@@ -1,4 +1,6 @@
-from project_management.rest_api import app
+from project_management.rest_api import config_from_env, create_app
+
+app = create_app(config_from_env())
 
 if __name__ == "__main__":
     app.run(debug=True)
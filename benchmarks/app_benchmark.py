@@ -0,0 +1,220 @@
+"""
+Times every ProjectManagementApp operation on seeded boards of several sizes, each
+against a fresh temporary SQLite store, and compares the medians with a stored
+baseline.
+
+    python -m benchmarks.app_benchmark                       # run and compare
+    python -m benchmarks.app_benchmark --output results.json
+    python -m benchmarks.app_benchmark --update-baseline     # accept the current numbers
+
+The exit status is 1 when an operation's median regresses beyond the tolerance.
+Baselines are machine specific, regenerate them on the machine that runs the check.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from project_management.project_management_app import ProjectManagementApp
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name: (columns, cards per column, history length)
+SCENARIOS = {
+    "small": (3, 10, 50),
+    "medium": (5, 100, 200),
+    "large": (8, 500, 500),
+}
+
+
+class BenchmarkBoard:
+
+    def __init__(self, app, seed, columns, cards_per_column, history_length):
+        self.app = app
+        self.rng = random.Random(seed)
+        document = {
+            "title": "Benchmark",
+            "columns": [
+                {"title": f"Column {c}", "cards": [{"title": f"Card {c}.{i}"} for i in range(cards_per_column)]}
+                for c in range(columns)
+            ],
+        }
+        self.board_id = app.import_board(document)
+        for _ in range(history_length):
+            self.random_edit()
+
+    def columns(self):
+        return self.app.repository.get(self.board_id).columns
+
+    def random_card(self, columns=None):
+        columns = [column for column in (columns or self.columns()) if column.cards]
+        column = self.rng.choice(columns)
+        return column, self.rng.choice(column.cards)
+
+    def random_edit(self):
+        column, card = self.random_card()
+        if self.rng.random() < 0.5:
+            self.app.edit_card_title(self.board_id, column.id, card.id, f"Title {self.rng.random()}")
+        else:
+            self.app.edit_card_content(self.board_id, column.id, card.id, f"Content {self.rng.random()}")
+
+
+def _operations(board: BenchmarkBoard):
+    # Each entry prepares arguments outside the timed section, then runs the operation.
+    app = board.app
+    board_id = board.board_id
+    rng = board.rng
+
+    def card_args():
+        column, card = board.random_card()
+        return column.id, card.id
+
+    def move_across_args():
+        columns = board.columns()
+        from_column, card = board.random_card(columns)
+        to_column = rng.choice([column for column in columns if column.id != from_column.id])
+        return from_column.id, to_column.id, card.id, rng.randrange(len(to_column.cards) + 1)
+
+    def move_within_args():
+        column, card = board.random_card()
+        return column.id, column.id, card.id, rng.randrange(len(column.cards) + 1)
+
+    def removable_card_args():
+        column = rng.choice(board.columns())
+        return column.id, app.add_card(board_id, column.id)
+
+    def removable_column_args():
+        return (app.add_column(board_id),)
+
+    return {
+        "create_board": (lambda: (), lambda: app.create_board()),
+        "import_board": (lambda: (app.board_as_dict(board_id)["board"],), lambda d: app.import_board(d)),
+        "clone_board": (lambda: (), lambda: app.clone_board(board_id)),
+        "edit_board_title": (lambda: (f"Title {rng.random()}",), lambda t: app.edit_board_title(board_id, t)),
+        "edit_column_title": (lambda: (rng.choice(board.columns()).id, f"Title {rng.random()}"),
+                              lambda c, t: app.edit_column_title(board_id, c, t)),
+        "edit_card_title": (card_args, lambda c, k: app.edit_card_title(board_id, c, k, f"T {rng.random()}")),
+        "edit_card_content": (card_args, lambda c, k: app.edit_card_content(board_id, c, k, f"C {rng.random()}")),
+        "add_column": (lambda: (), lambda: app.add_column(board_id)),
+        "remove_column": (removable_column_args, lambda c: app.remove_column(board_id, c)),
+        "move_column": (lambda: (rng.choice(board.columns()).id, rng.randrange(len(board.columns()) + 1)),
+                        lambda c, i: app.move_column(board_id, c, i)),
+        "add_card": (lambda: (rng.choice(board.columns()).id,), lambda c: app.add_card(board_id, c)),
+        "remove_card": (removable_card_args, lambda c, k: app.remove_card(board_id, c, k)),
+        "move_card_within_column": (move_within_args, lambda *a: app.move_card(board_id, *a)),
+        "move_card_across_columns": (move_across_args, lambda *a: app.move_card(board_id, *a)),
+        "undo": (lambda: (), lambda: app.undo(board_id)),
+        "redo": (lambda: (), lambda: app.redo(board_id)),
+        "board_as_dict": (lambda: (), lambda: app.board_as_dict(board_id)),
+        "render_board": (lambda: (), lambda: b"".join(app.render_board(board_id))),
+    }
+
+
+def run_scenario(name, seed, repeat):
+    columns, cards_per_column, history_length = SCENARIOS[name]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        app = ProjectManagementApp(env={
+            "PERSISTENCE_MODULE": "eventsourcing.sqlite",
+            "SQLITE_DBNAME": os.path.join(temp_dir, "events.db"),
+        })
+        try:
+            board = BenchmarkBoard(app, seed, columns, cards_per_column, history_length)
+            results = {}
+            for operation, (prepare, run) in _operations(board).items():
+                timings = []
+                for _ in range(repeat):
+                    args = prepare()
+                    started = time.perf_counter()
+                    run(*args)
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                results[operation] = {
+                    "median_ms": statistics.median(timings),
+                    "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+                }
+            return results
+        finally:
+            app.close()
+
+
+def run_benchmarks(scenarios, seed=0, repeat=20, on_scenario=None):
+    results = {}
+    for name in scenarios:
+        results[name] = run_scenario(name, seed, repeat)
+        if on_scenario is not None:
+            on_scenario(name, results[name])
+    return {
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "seed": seed,
+        "repeat": repeat,
+        "scenarios": {name: {"parameters": dict(zip(("columns", "cards_per_column", "history_length"),
+                                                     SCENARIOS[name])),
+                             "operations": operations}
+                      for name, operations in results.items()},
+    }
+
+
+def find_regressions(results, baseline, tolerance=1.5, noise_floor_ms=0.5):
+    # Medians under the noise floor are too small to compare reliably.
+    regressions = []
+    for name, scenario in results["scenarios"].items():
+        baseline_operations = baseline.get("scenarios", {}).get(name, {}).get("operations", {})
+        for operation, timing in scenario["operations"].items():
+            if operation not in baseline_operations:
+                continue
+            baseline_median = baseline_operations[operation]["median_ms"]
+            median = timing["median_ms"]
+            if median > noise_floor_ms and median > baseline_median * tolerance:
+                regressions.append((name, operation, baseline_median, median))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ProjectManagementApp operations against a baseline.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run, may be repeated (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per operation")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="fail when a median exceeds the baseline by this factor")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    def on_scenario(name, operations):
+        print(f"{name} {SCENARIOS[name]}")
+        for operation, timing in operations.items():
+            print(f"  {operation:<26} median {timing['median_ms']:8.2f} ms   p95 {timing['p95_ms']:8.2f} ms")
+
+    results = run_benchmarks(args.scenario or list(SCENARIOS), args.seed, args.repeat, on_scenario)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for name, operation, baseline_median, median in regressions:
+        print(f"REGRESSION {name}/{operation}: {baseline_median:.2f} ms -> {median:.2f} ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Runs concurrent user scenarios against the REST API and reports throughput,
+p50/p95/p99 latency per route and the rate of version conflicts (HTTP 409).
+
+By default a server is started in a subprocess with a fresh database in a temporary
+directory. Pass --url to target a server that is already running.
+
+    python -m benchmarks.load_generator --users polling=20,drag_drop=5,typing=5 --duration 30
+
+Scenarios:
+    polling     a browser tab re-fetching the board
+    drag_drop   fetches the board and moves a random card to another column
+    typing      types a card title one keystroke per request, then undoes a few times
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ApiClient:
+
+    def __init__(self, base_url, recorder=None):
+        self.base_url = base_url
+        self.recorder = recorder
+
+    def request(self, method, route, payload=None, query=None):
+        url = self.base_url + route + (f"?{query}" if query else "")
+        data = json.dumps(payload).encode() if payload is not None else None
+        http_request = urllib.request.Request(url, data=data, method=method,
+                                              headers={"Content-Type": "application/json"})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(http_request, timeout=30) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        except OSError:
+            status, body = 0, b""
+        try:
+            decoded = json.loads(body) if body else None
+        except ValueError:
+            # Not an API response, e.g. an HTML error page from a proxy; counted as an error.
+            status, decoded = (status if status >= 500 else 0), None
+        if self.recorder is not None:
+            self.recorder.record(route, status, time.perf_counter() - started)
+        return status, decoded
+
+    def board(self, board_id):
+        status, body = self.request("GET", "/board_as_dict", query=f"board_id={board_id}")
+        return body["board"] if status == 200 and body and "board" in body else None
+
+
+class LoadRecorder:
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, status, seconds):
+        with self._lock:
+            self._samples.setdefault(route, []).append((status, seconds))
+
+    def report(self, elapsed_seconds):
+        routes = {}
+        total = conflicts = shed = errors = 0
+        for route, samples in sorted(self._samples.items()):
+            latencies = sorted(seconds for _, seconds in samples)
+            route_conflicts = sum(1 for status, _ in samples if status == 409)
+            route_shed = sum(1 for status, _ in samples if status == 503)
+            route_errors = sum(1 for status, _ in samples if status >= 500 or status == 0) - route_shed
+            routes[route] = {
+                "requests": len(samples),
+                "throughput_rps": len(samples) / elapsed_seconds,
+                "p50_ms": _percentile(latencies, 50) * 1000,
+                "p95_ms": _percentile(latencies, 95) * 1000,
+                "p99_ms": _percentile(latencies, 99) * 1000,
+                "conflicts": route_conflicts,
+                "shed": route_shed,
+                "errors": route_errors,
+            }
+            total += len(samples)
+            conflicts += route_conflicts
+            shed += route_shed
+            errors += route_errors
+        return {
+            "elapsed_seconds": elapsed_seconds,
+            "requests": total,
+            "throughput_rps": total / elapsed_seconds if elapsed_seconds else 0.0,
+            "conflict_rate": conflicts / total if total else 0.0,
+            "shed_rate": shed / total if total else 0.0,
+            "error_rate": errors / total if total else 0.0,
+            "routes": routes,
+        }
+
+
+def _percentile(sorted_values, percentile):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(percentile / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def polling(client, board_id, rng, stop, interval=0.25):
+    while not stop.is_set():
+        client.board(board_id)
+        stop.wait(interval * rng.uniform(0.5, 1.5))
+
+
+def drag_drop(client, board_id, rng, stop, retry_interval=0.25):
+    while not stop.is_set():
+        board = client.board(board_id)
+        sources = [column for column in (board or {}).get("columns", []) if column["cards"]]
+        if not sources:
+            stop.wait(retry_interval)
+            continue
+        source = rng.choice(sources)
+        target = rng.choice(board["columns"])
+        client.request("PUT", "/move_card", {
+            "board_id": board_id,
+            "from_column_id": source["id"],
+            "to_column_id": target["id"],
+            "card_id": rng.choice(source["cards"])["id"],
+            "new_index": rng.randrange(len(target["cards"]) + 1),
+        })
+
+
+def typing(client, board_id, rng, stop, word="performance", undos=3, retry_interval=0.25):
+    while not stop.is_set():
+        board = client.board(board_id)
+        cards = [(column["id"], card["id"]) for column in (board or {}).get("columns", []) for card in column["cards"]]
+        if not cards:
+            stop.wait(retry_interval)
+            continue
+        column_id, card_id = rng.choice(cards)
+        for i in range(1, len(word) + 1):
+            if stop.is_set():
+                return
+            client.request("PUT", "/edit_card_title", {
+                "board_id": board_id, "column_id": column_id, "card_id": card_id, "title": word[:i],
+            })
+        for _ in range(undos):
+            client.request("POST", "/undo", {"board_id": board_id})
+
+
+SCENARIOS = {
+    "polling": polling,
+    "drag_drop": drag_drop,
+    "typing": typing,
+}
+
+
+def set_up_board(client, columns, cards_per_column):
+    _, body = client.request("POST", "/create_board")
+    board_id = body["board_id"]
+    for _ in range(columns):
+        _, body = client.request("POST", "/add_column_to_board", {"board_id": board_id})
+        for _ in range(cards_per_column):
+            client.request("POST", "/add_card_to_column", {"board_id": board_id, "column_id": body["column_id"]})
+    return board_id
+
+
+def run_load(base_url, users, duration, boards=1, columns=4, cards_per_column=10, seed=0):
+    setup_client = ApiClient(base_url)
+    board_ids = [set_up_board(setup_client, columns, cards_per_column) for _ in range(boards)]
+
+    recorder = LoadRecorder()
+    stop = threading.Event()
+    threads = []
+    for scenario, count in users.items():
+        for i in range(count):
+            rng = random.Random(f"{seed}-{scenario}-{i}")
+            thread = threading.Thread(target=SCENARIOS[scenario], daemon=True, args=(
+                ApiClient(base_url, recorder), board_ids[i % len(board_ids)], rng, stop))
+            threads.append(thread)
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return recorder.report(time.perf_counter() - started)
+
+
+@contextmanager
+def local_server(startup_timeout=30):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        env = dict(os.environ, PYTHONPATH=REPOSITORY_ROOT)
+        server = subprocess.Popen(
+            [sys.executable, "-c",
+             "from project_management.rest_api import config_from_env, create_app; "
+             f"create_app(config_from_env()).run(host='127.0.0.1', port={port}, threaded=True)"],
+            cwd=temp_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                    break
+                except OSError:
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("Local server did not start")
+                    time.sleep(0.1)
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def parse_users(value):
+    users = {}
+    for part in value.split(","):
+        scenario, _, count = part.partition("=")
+        if scenario not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {scenario!r}, choose from {', '.join(SCENARIOS)}")
+        users[scenario] = int(count or 1)
+    return users
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run concurrent user scenarios against the REST API.")
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    parser.add_argument("--users", type=parse_users, default=parse_users("polling=10,drag_drop=3,typing=3"),
+                        help="comma separated scenario=count pairs (default: polling=10,drag_drop=3,typing=3)")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--boards", type=int, default=1, help="boards the users are spread over")
+    parser.add_argument("--columns", type=int, default=4)
+    parser.add_argument("--cards", type=int, default=10, help="cards per column")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    load = (args.users, args.duration, args.boards, args.columns, args.cards, args.seed)
+    if args.url:
+        report = run_load(args.url.rstrip("/"), *load)
+    else:
+        with local_server() as base_url:
+            report = run_load(base_url, *load)
+
+    print(f"{report['requests']} requests in {report['elapsed_seconds']:.1f}s "
+          f"({report['throughput_rps']:.1f} req/s), conflict rate {report['conflict_rate']:.2%}, "
+          f"shed rate {report['shed_rate']:.2%}, error rate {report['error_rate']:.2%}")
+    for route, stats in report["routes"].items():
+        print(f"  {route:<20} {stats['requests']:6d} req {stats['throughput_rps']:7.1f} req/s   "
+              f"p50 {stats['p50_ms']:7.1f} ms  p95 {stats['p95_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms  "
+              f"409 {stats['conflicts']}  503 {stats['shed']}  5xx {stats['errors']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Measures how many bytes each additional board version costs when every version is
+kept in memory, as undo and caching do.
+
+"copied" models the previous representation: mutable, dict-backed cards and columns,
+where keeping a version means keeping a deep copy of every column list.
+"shared" keeps the columns tuple of a real Board after each event, which shares
+every column and card the event did not touch.
+
+    python -m benchmarks.memory_per_version --columns 5 --cards 1000 --versions 200
+"""
+import argparse
+import copy
+import random
+import tracemalloc
+from uuid import uuid4
+
+from project_management.domain_model import Board
+
+
+class _CopiedCard:
+
+    def __init__(self, card_id):
+        self.id = card_id
+        self.title = ""
+        self.content = ""
+
+
+class _CopiedColumn:
+
+    def __init__(self, column_id):
+        self.id = column_id
+        self.title = ""
+        self.cards = []
+
+
+def _edits(columns, cards_per_column, versions, seed):
+    rng = random.Random(seed)
+    return [(rng.randrange(columns), rng.randrange(cards_per_column), f"Title {i}") for i in range(versions)]
+
+
+def measure_copied(column_ids, card_ids, edits):
+    tracemalloc.start()
+    columns = []
+    for column_id, column_card_ids in zip(column_ids, card_ids):
+        column = _CopiedColumn(column_id)
+        for card_id in column_card_ids:
+            column.cards.append(_CopiedCard(card_id))
+        columns.append(column)
+    base, _ = tracemalloc.get_traced_memory()
+
+    versions = []
+    for column_index, card_index, title in edits:
+        columns[column_index].cards[card_index].title = title
+        versions.append(copy.deepcopy(columns))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return base, (current - base) / len(edits)
+
+
+def measure_shared(column_ids, card_ids, edits):
+    tracemalloc.start()
+    board = Board()
+    for column_id, column_card_ids in zip(column_ids, card_ids):
+        board.add_column(column_id)
+        for card_id in column_card_ids:
+            board.add_card(column_id, card_id)
+    board.collect_events()
+    base, _ = tracemalloc.get_traced_memory()
+
+    versions = []
+    for column_index, card_index, title in edits:
+        board.edit_card_title(column_ids[column_index], card_ids[column_index][card_index], title)
+        board.collect_events()
+        versions.append(board.columns)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return base, (current - base) / len(edits)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-version memory of copied and shared board state.")
+    parser.add_argument("--columns", type=int, default=5)
+    parser.add_argument("--cards", type=int, default=1000, help="cards per column")
+    parser.add_argument("--versions", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    column_ids = [uuid4() for _ in range(args.columns)]
+    card_ids = [[uuid4() for _ in range(args.cards)] for _ in range(args.columns)]
+    edits = _edits(args.columns, args.cards, args.versions, args.seed)
+
+    print(f"{args.columns} columns x {args.cards} cards, {args.versions} versions kept")
+    for name, measure in (("copied", measure_copied), ("shared", measure_shared)):
+        base, per_version = measure(column_ids, card_ids, edits)
+        print(f"  {name:<7} base board {base / 1024:10.1f} KiB   per version {per_version / 1024:10.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
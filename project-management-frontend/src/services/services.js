@@ -5,118 +5,105 @@ const handleResponse = async (response) => {
     return response.json();
 };
 
+const MAX_ATTEMPTS = 4;
+const RETRYABLE_STATUSES = [409, 502, 503, 504];
+
+// Commands carry a request_id, so the server runs each one once however often it is
+// sent. That makes it safe to retry after a network error or a gateway timeout, after
+// a 409 version conflict with another server process, or after a 503 from an
+// overloaded server, which says in Retry-After how long to wait. Other errors, like
+// the 422 for a card or column that was moved or removed, would fail the same way
+// again and are not retried.
+const sendCommand = async (path, method, payload = {}) => {
+    const body = JSON.stringify({...payload, request_id: crypto.randomUUID()});
+    for (let attempt = 1; ; attempt++) {
+        let delay = 50 * 2 ** attempt;
+        try {
+            const response = await fetch(`${API_BASE_URL}${path}`, {
+                method,
+                headers: {'Content-Type': 'application/json'},
+                body,
+            });
+            const retryable = RETRYABLE_STATUSES.includes(response.status);
+            if (!retryable || attempt === MAX_ATTEMPTS) return handleResponse(response);
+            const retryAfter = Number(response.headers.get('Retry-After'));
+            if (retryAfter > 0) delay = retryAfter * 1000;
+        } catch (err) {
+            if (attempt === MAX_ATTEMPTS) throw err;
+        }
+        await new Promise((resolve) => setTimeout(resolve, delay));
+    }
+};
+
 export const boardService = {
-    create: () => fetch(`${API_BASE_URL}/create_board`, {
-        method: 'POST'
-    }).then(handleResponse),
+    create: () => sendCommand('/create_board', 'POST'),
 
     get: (id, version = null) =>
         fetch(`${API_BASE_URL}/board_as_dict?board_id=${id}`).then(handleResponse),
 
-    updateTitle: (id, title) => fetch(`${API_BASE_URL}/edit_board_title`, {
-        method: 'PUT',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({board_id: id, title}),
-    }).then(handleResponse),
-
-    undo: (id) => fetch(`${API_BASE_URL}/undo`, {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({board_id: id}),
-    }).then(handleResponse),
-
-    redo: (id) => fetch(`${API_BASE_URL}/redo`, {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({board_id: id}),
-    }).then(handleResponse),
+    updateTitle: (id, title) => sendCommand('/edit_board_title', 'PUT', {board_id: id, title}),
+
+    undo: (id) => sendCommand('/undo', 'POST', {board_id: id}),
+
+    redo: (id) => sendCommand('/redo', 'POST', {board_id: id}),
 };
 
 export const columnService = {
-    add: (boardId) => fetch(`${API_BASE_URL}/add_column_to_board`, {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({board_id: boardId}),
-    }).then(handleResponse),
-
-    remove: (boardId, columnId) => fetch(`${API_BASE_URL}/remove_column_from_board`, {
-        method: 'DELETE',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({board_id: boardId, column_id: columnId}),
-    }).then(handleResponse),
-
-    move: (boardId, columnId, newIndex) => fetch(`${API_BASE_URL}/move_column_within_board`, {
-        method: 'PUT',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({
-            board_id: boardId,
-            column_id: columnId,
-            new_index: newIndex
-        }),
-    }).then(handleResponse),
-
-    updateTitle: (boardId, columnId, title) => fetch(`${API_BASE_URL}/edit_column_title`, {
-        method: 'PUT',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({
-            board_id: boardId,
-            column_id: columnId,
-            title
-        }),
-    }).then(handleResponse),
+    add: (boardId, columnId = crypto.randomUUID()) => sendCommand('/add_column_to_board', 'POST', {
+        board_id: boardId,
+        column_id: columnId
+    }),
+
+    remove: (boardId, columnId) => sendCommand('/remove_column_from_board', 'DELETE', {
+        board_id: boardId,
+        column_id: columnId
+    }),
+
+    move: (boardId, columnId, newIndex) => sendCommand('/move_column_within_board', 'PUT', {
+        board_id: boardId,
+        column_id: columnId,
+        new_index: newIndex
+    }),
+
+    updateTitle: (boardId, columnId, title) => sendCommand('/edit_column_title', 'PUT', {
+        board_id: boardId,
+        column_id: columnId,
+        title
+    }),
 };
 
 export const cardService = {
-    add: (boardId, columnId) => fetch(`${API_BASE_URL}/add_card_to_column`, {
-        method: 'POST',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({board_id: boardId, column_id: columnId}),
-    }).then(handleResponse),
-
-    remove: (boardId, columnId, cardId) => fetch(`${API_BASE_URL}/remove_card_from_column`, {
-        method: 'DELETE',
-        headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({
-            board_id: boardId,
-            column_id: columnId,
-            card_id: cardId
-        }),
-    }).then(handleResponse),
-
-    move: (boardId, fromColumnId, toColumnId, cardId, newIndex) =>
-        fetch(`${API_BASE_URL}/move_card`, {
-            method: 'PUT',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                board_id: boardId,
-                from_column_id: fromColumnId,
-                to_column_id: toColumnId,
-                card_id: cardId,
-                new_index: newIndex
-            }),
-        }).then(handleResponse),
-
-    updateTitle: (boardId, columnId, cardId, title) =>
-        fetch(`${API_BASE_URL}/edit_card_title`, {
-            method: 'PUT',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                board_id: boardId,
-                column_id: columnId,
-                card_id: cardId,
-                title
-            }),
-        }).then(handleResponse),
-
-    updateContent: (boardId, columnId, cardId, content) =>
-        fetch(`${API_BASE_URL}/edit_card_content`, {
-            method: 'PUT',
-            headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                board_id: boardId,
-                column_id: columnId,
-                card_id: cardId,
-                content
-            }),
-        }).then(handleResponse),
-};
\ No newline at end of file
+    add: (boardId, columnId, cardId = crypto.randomUUID()) => sendCommand('/add_card_to_column', 'POST', {
+        board_id: boardId,
+        column_id: columnId,
+        card_id: cardId
+    }),
+
+    remove: (boardId, columnId, cardId) => sendCommand('/remove_card_from_column', 'DELETE', {
+        board_id: boardId,
+        column_id: columnId,
+        card_id: cardId
+    }),
+
+    move: (boardId, fromColumnId, toColumnId, cardId, newIndex) => sendCommand('/move_card', 'PUT', {
+        board_id: boardId,
+        from_column_id: fromColumnId,
+        to_column_id: toColumnId,
+        card_id: cardId,
+        new_index: newIndex
+    }),
+
+    updateTitle: (boardId, columnId, cardId, title) => sendCommand('/edit_card_title', 'PUT', {
+        board_id: boardId,
+        column_id: columnId,
+        card_id: cardId,
+        title
+    }),
+
+    updateContent: (boardId, columnId, cardId, content) => sendCommand('/edit_card_content', 'PUT', {
+        board_id: boardId,
+        column_id: columnId,
+        card_id: cardId,
+        content
+    }),
+};
@@ -0,0 +1,6 @@
+from .admission_controller import AdmissionController
+from .admission_controller import OverloadedError
+from .board_locks import BoardLocks
+from .board_locks import board_locked
+from .request_deduplicator import RequestDeduplicator
+from .single_flight import SingleFlight
@@ -0,0 +1,96 @@
+import time
+from contextlib import contextmanager
+from threading import Condition
+
+
+class OverloadedError(Exception):
+
+    def __init__(self, retry_after):
+        super().__init__("Server is overloaded, retry later")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds the requests doing work at once. Writes may take every slot; expensive reads
+    leave reserved_for_writes slots free, run at most max_reads_per_board at a time on
+    one board and wait while any write is waiting. A request that finds max_queued
+    others of its kind waiting, or cannot start within queue_timeout seconds, fails
+    with OverloadedError rather than adding to everyone's latency.
+    """
+
+    def __init__(self, max_concurrent=16, reserved_for_writes=4, max_reads_per_board=2,
+                 max_queued=64, queue_timeout=1.0, retry_after=1):
+        self.max_concurrent = max_concurrent
+        self.max_reads = max(1, max_concurrent - reserved_for_writes)
+        self.max_reads_per_board = max_reads_per_board
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.shed = 0
+        self._active = 0
+        self._active_reads = 0
+        self._board_reads = {}
+        self._waiting_writes = 0
+        self._waiting_reads = 0
+        self._condition = Condition()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            if self._active >= self.max_concurrent:
+                if self._waiting_writes >= self.max_queued:
+                    self._shed()
+                self._waiting_writes += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self._active < self.max_concurrent,
+                                                        self.queue_timeout)
+                finally:
+                    self._waiting_writes -= 1
+                    self._condition.notify_all()
+                if not admitted:
+                    self._shed()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def read(self, board_id):
+        with self._condition:
+            if not self._can_read(board_id):
+                if self._waiting_reads >= self.max_queued:
+                    self._shed()
+                self._waiting_reads += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self._can_read(board_id), self.queue_timeout)
+                finally:
+                    self._waiting_reads -= 1
+                if not admitted:
+                    self._shed()
+            self._active += 1
+            self._active_reads += 1
+            self._board_reads[board_id] = self._board_reads.get(board_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._active_reads -= 1
+                self._board_reads[board_id] -= 1
+                if not self._board_reads[board_id]:
+                    del self._board_reads[board_id]
+                self._condition.notify_all()
+
+    def _can_read(self, board_id):
+        return (not self._waiting_writes
+                and self._active < self.max_concurrent
+                and self._active_reads < self.max_reads
+                and self._board_reads.get(board_id, 0) < self.max_reads_per_board)
+
+    def _shed(self):
+        self.shed += 1
+        raise OverloadedError(self.retry_after)
@@ -0,0 +1,23 @@
+import functools
+from threading import Lock
+
+
+class BoardLocks:
+    # Striped so the number of locks stays fixed however many boards are touched.
+
+    def __init__(self, stripes=64):
+        self._locks = tuple(Lock() for _ in range(stripes))
+
+    def lock_for(self, board_id):
+        return self._locks[hash(board_id) % len(self._locks)]
+
+
+def board_locked(method):
+    # Serializes a board's read-modify-save within this process, so concurrent
+    # commands to one board queue up instead of failing with a version conflict.
+    @functools.wraps(method)
+    def wrapper(self, board_id, *args, **kwargs):
+        with self.board_locks.lock_for(board_id):
+            return method(self, board_id, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+from threading import Condition
+
+
+class RequestDeduplicator:
+    """
+    Remembers the results of the last max_entries requests by request id. A retry
+    gets the stored result instead of running the command again, and a retry that
+    arrives while the first attempt is still running waits for it. Failed attempts,
+    and results for which remember returns False, are not kept, so they can be retried.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._in_flight = set()
+        self._condition = Condition()
+
+    def __len__(self):
+        return len(self._results)
+
+    def run(self, key, f, remember=None):
+        with self._condition:
+            while True:
+                if key in self._results:
+                    self._results.move_to_end(key)
+                    return self._results[key]
+                if key not in self._in_flight:
+                    self._in_flight.add(key)
+                    break
+                self._condition.wait()
+
+        try:
+            result = f()
+        except BaseException:
+            with self._condition:
+                self._in_flight.discard(key)
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            self._in_flight.discard(key)
+            if remember is None or remember(result):
+                self._results[key] = result
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+            self._condition.notify_all()
+        return result
@@ -1,118 +1,175 @@
-from eventsourcing.domain import Aggregate, event
+import functools
+
+from eventsourcing.domain import Aggregate, Snapshot, event
 from project_management.utils.collection_utils import (
-    remove_item_by_id,
+    with_item_appended,
     with_item_moved_by_id,
-    edit_item_by_id,
-    find_item_by_id
+    with_item_replaced_by_id,
+    without_item_by_id,
+    find_item_by_id,
+    ItemNotFoundError
 )
-import logging
 
-logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.DEBUG)
 
+class _ImmutableValue:
+    # Values are shared between board versions, so they are never changed in place.
+    __slots__ = ()
 
-class Card:
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable, use replace()")
 
-    def __init__(self, card_id):
-        self.id = card_id
-        self.title = ""
-        self.content = ""
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
 
+    def __copy__(self):
+        return self
 
-class Column:
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return functools.partial(type(self), **self._values()), ()
+
+    def replace(self, **changes):
+        return type(self)(**{**self._values(), **changes})
+
+    def _values(self):
+        # Constructor parameters are named after the slots.
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Card(_ImmutableValue):
+    __slots__ = ("id", "title", "content")
+
+    def __init__(self, id, title="", content=""):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "content", content)
 
-    def __init__(self, column_id):
-        self.id = column_id
-        self.title = ""
-        self.cards = []
+
+class Column(_ImmutableValue):
+    __slots__ = ("id", "title", "cards", "modified_version")
+
+    def __init__(self, id, title="", cards=(), modified_version=None):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "cards", tuple(cards))
+        # Board version of the last event that changed this column, None when unknown.
+        object.__setattr__(self, "modified_version", modified_version)
+
+
+def _card_from_dict(data):
+    return Card(data["id"], data.get("title", ""), data.get("content", ""))
+
+
+def _column_from_dict(data, modified_version=None):
+    cards = (_card_from_dict(card) for card in data.get("cards", []))
+    return Column(data["id"], data.get("title", ""), cards, modified_version)
 
 
 class Board(Aggregate):
+
+    class Snapshot(Snapshot):
+        def mutate(self, _):
+            # The stored state comes back with the columns tuple as a list.
+            board = super().mutate(_)
+            board.columns = tuple(board.columns)
+            return board
+
     @event("BOARD_CREATED")
     def __init__(self):
-        logger.debug("BOARD_CREATED")
         self.title = ""
-        self.columns = []
+        self.columns = ()
         self.undo_jump_offset = 0
         self.undo_redo_tracker_id = None
 
     @event("UNDO_REDO_TRACKER_LINKED")
     def set_undo_redo_tracker(self, undo_redo_tracker_id):
-        logger.debug("UNDO_REDO_TRACKER_LINKED")
         self.undo_redo_tracker_id = undo_redo_tracker_id
 
     @event("BOARD_TITLE_EDITED")
     def edit_board_title(self, title):
-        logger.debug("BOARD_TITLE_EDITED")
         self.title = title
 
     @event("COLUMN_ADDED")
     def add_column(self, column_id):
-        logger.debug("COLUMN_ADDED")
-        column = Column(column_id)
-        self.columns.append(column)
+        column = Column(column_id, modified_version=self._next_version())
+        self.columns = with_item_appended(self.columns, column)
 
     @event("COLUMN_REMOVED")
     def remove_column(self, column_id):
-        logger.debug("COLUMN_REMOVED")
-        remove_item_by_id(self.columns, column_id)
+        self.columns = without_item_by_id(self.columns, column_id)
 
     @event("COLUMN_MOVED")
     def move_column(self, column_id, new_index):
-        logger.debug("COLUMN_MOVED")
-        # this operation creates a new array
         self.columns = with_item_moved_by_id(self.columns, column_id, new_index)
 
     @event("COLUMN_TITLE_EDITED")
     def edit_column_title(self, column_id, title):
-        logger.debug("COLUMN_TITLE_EDITED")
-        edit_item_by_id(self.columns, column_id, lambda column: setattr(column, 'title', title))
+        self._change_column(column_id, lambda column: column.replace(title=title))
 
     @event("CARD_TITLE_EDITED")
     def edit_card_title(self, column_id, card_id, title):
-        logger.debug("CARD_TITLE_EDITED")
-        column = find_item_by_id(self.columns, column_id)
-        edit_item_by_id(column.cards, card_id, lambda card: setattr(card, 'title', title))
+        self._change_cards(column_id, lambda cards: with_item_replaced_by_id(
+            cards, card_id, lambda card: card.replace(title=title)))
 
     @event("CARD_CONTENT_EDITED")
     def edit_card_content(self, column_id, card_id, content):
-        logger.debug("CARD_CONTENT_EDITED")
-        column = find_item_by_id(self.columns, column_id)
-        edit_item_by_id(column.cards, card_id, lambda card: setattr(card, 'content', content))
+        self._change_cards(column_id, lambda cards: with_item_replaced_by_id(
+            cards, card_id, lambda card: card.replace(content=content)))
 
     @event("CARD_ADDED")
     def add_card(self, column_id, card_id, title=None, content=None):
-        logger.debug("CARD_ADDED")
-        card = Card(card_id)
-        if title is not None:
-            card.title = title
-        if content is not None:
-            card.content = content
-
-        column = find_item_by_id(self.columns, column_id)
-        column.cards.append(card)
+        card = Card(card_id, title or "", content or "")
+        self._change_cards(column_id, lambda cards: with_item_appended(cards, card))
 
     @event("CARD_REMOVED")
     def remove_card(self, column_id, card_id):
-        logger.debug("CARD_REMOVED")
-        column = find_item_by_id(self.columns, column_id)
-        remove_item_by_id(column.cards, card_id)
+        self._change_cards(column_id, lambda cards: without_item_by_id(cards, card_id))
 
     @event("CARD_MOVED")
     def move_card(self, column_id, card_id, new_index):
-        logger.debug("CARD_MOVED")
-        column = find_item_by_id(self.columns, column_id)
-        column.cards = with_item_moved_by_id(column.cards, card_id, new_index)
+        self._change_cards(column_id, lambda cards: with_item_moved_by_id(cards, card_id, new_index))
 
     def get_card(self, column_id, card_id):
-        logger.debug("CARD_MOVED")
         column = find_item_by_id(self.columns, column_id)
-        card = find_item_by_id(column.cards, card_id)
+        card = find_item_by_id(column.cards, card_id) if column is not None else None
         if card is None:
-            raise ValueError(f"Card {card_id} not found in column {column_id}")
+            raise ItemNotFoundError(f"Card {card_id} not found in column {column_id}")
         return card
 
+    def contains_column(self, column_id):
+        return find_item_by_id(self.columns, column_id) is not None
+
+    def contains_card(self, card_id):
+        return any(find_item_by_id(column.cards, card_id) is not None for column in self.columns)
+
+    @event("BOARD_IMPORTED")
+    def import_board(self, title, columns):
+        self.title = title
+        self.columns = tuple(_column_from_dict(column, self._next_version()) for column in columns)
+
+    @event("BOARD_CLONED")
+    def clone_board(self, source_board_id, source_version, title, columns):
+        self.title = title
+        self.columns = tuple(_column_from_dict(column, self._next_version()) for column in columns)
+
+    @event("CARDS_IMPORTED")
+    def import_cards(self, column_id, cards):
+        imported = tuple(_card_from_dict(card) for card in cards)
+        self._change_cards(column_id, lambda existing: existing + imported)
+
+    def _next_version(self):
+        # Events apply before the aggregate's version is incremented.
+        return self.version + 1
+
+    def _change_column(self, column_id, f):
+        self.columns = with_item_replaced_by_id(
+            self.columns, column_id, lambda column: f(column).replace(modified_version=self._next_version()))
+
+    def _change_cards(self, column_id, f):
+        self._change_column(column_id, lambda column: column.replace(cards=f(column.cards)))
+
     @event("COMMIT_UNDO_STATE")
     def commit_undo_state(self):
-        logger.debug("COMMIT_UNDO_STATE")
         pass
@@ -0,0 +1,4 @@
+from .board_diff import diff_board_versions
+from .retained_versions import check_range_retained
+from .retained_versions import check_versions_retained
+from .retained_versions import first_retained_version
@@ -0,0 +1,130 @@
+import copy
+from difflib import SequenceMatcher
+from uuid import UUID
+
+from eventsourcing.application import project_aggregate
+
+from project_management.history.retained_versions import check_versions_retained
+
+
+def diff_board_versions(app, board_id: UUID, from_version: int, to_version: int) -> dict:
+    if from_version > to_version:
+        raise ValueError("from_version must not be greater than to_version")
+    check_versions_retained(app, board_id, from_version, to_version)
+    before = app.repository.get(board_id, version=from_version)
+    after = _replay_onto(app, board_id, before, to_version)
+
+    diff = {
+        "board_id": str(board_id),
+        "from_version": before.version,
+        "to_version": after.version,
+    }
+    if before.title != after.title:
+        diff["title"] = {"from": before.title, "to": after.title}
+    diff["columns"] = _diff_columns(before.columns, after.columns)
+    diff["cards"] = _diff_cards(before.columns, after.columns)
+    return diff
+
+
+def _replay_onto(app, board_id, base, to_version):
+    # Undo commits keep the state they restore in a snapshot at the commit version, so
+    # the latest snapshot in the range is where the replay has to start, like a
+    # repository would.
+    snapshots = list(app.snapshots.get(board_id, gt=base.version, lte=to_version, desc=True, limit=1))
+    if snapshots:
+        board = snapshots[0].mutate(None)
+    else:
+        # Columns and cards are immutable, so the copy shares them with the base and
+        # unchanged ones compare by identity.
+        board = copy.copy(base)
+    return project_aggregate(board, app.events.get(board_id, gt=board.version, lte=to_version))
+
+
+def _diff_columns(before, after):
+    before_by_id = {column.id: (i, column) for i, column in enumerate(before)}
+    after_by_id = {column.id: (i, column) for i, column in enumerate(after)}
+    diff = {
+        "added": [{"id": str(column.id), "index": i, "title": column.title}
+                  for i, column in enumerate(after) if column.id not in before_by_id],
+        "removed": [{"id": str(column.id), "index": i, "title": column.title}
+                    for i, column in enumerate(before) if column.id not in after_by_id],
+        "moved": [{"id": str(column_id), "from_index": before_by_id[column_id][0],
+                   "to_index": after_by_id[column_id][0]}
+                  for column_id in _moved_ids(before, after_by_id, after, before_by_id)],
+        "renamed": [],
+    }
+    for column_id, (_, column) in after_by_id.items():
+        previous = before_by_id.get(column_id)
+        if previous is not None and previous[1] is not column and previous[1].title != column.title:
+            diff["renamed"].append({"id": str(column_id), "from": previous[1].title, "to": column.title})
+    return diff
+
+
+def _diff_cards(before_columns, after_columns):
+    # Only columns that are not shared between the versions can hold changed cards.
+    before_columns_by_id = {column.id: column for column in before_columns}
+    after_columns_by_id = {column.id: column for column in after_columns}
+    changed_before = [column for column in before_columns if after_columns_by_id.get(column.id) is not column]
+    changed_after = [column for column in after_columns if before_columns_by_id.get(column.id) is not column]
+    before_cards = _cards_by_id(changed_before)
+    after_cards = _cards_by_id(changed_after)
+    diff = {"added": [], "removed": [], "moved": [], "edited": []}
+
+    for card_id, (column_id, index, card) in after_cards.items():
+        if card_id not in before_cards:
+            diff["added"].append({"id": str(card_id), "column_id": str(column_id), "index": index,
+                                  "title": card.title, "content": card.content})
+    for card_id, (column_id, index, card) in before_cards.items():
+        if card_id not in after_cards:
+            diff["removed"].append({"id": str(card_id), "column_id": str(column_id), "index": index,
+                                    "title": card.title})
+
+    moved_ids = set()
+    for column in changed_after:
+        previous = before_columns_by_id.get(column.id)
+        if previous is not None:
+            moved_ids.update(_moved_ids(previous.cards, {card.id: card for card in column.cards},
+                                        column.cards, {card.id: card for card in previous.cards}))
+        for card in column.cards:
+            before_card = before_cards.get(card.id)
+            if before_card is None:
+                continue
+            if before_card[0] != column.id:
+                moved_ids.add(card.id)
+            if before_card[2] is not card:
+                edited = _edited_fields(before_card[2], card)
+                if edited:
+                    diff["edited"].append({"id": str(card.id), "column_id": str(column.id), **edited})
+
+    for card_id in moved_ids:
+        from_column_id, from_index, _ = before_cards[card_id]
+        to_column_id, to_index, _ = after_cards[card_id]
+        diff["moved"].append({"id": str(card_id), "from_column_id": str(from_column_id), "from_index": from_index,
+                              "to_column_id": str(to_column_id), "to_index": to_index})
+    diff["moved"].sort(key=lambda move: (move["to_column_id"], move["to_index"]))
+    return diff
+
+
+def _cards_by_id(columns):
+    return {card.id: (column.id, i, card) for column in columns for i, card in enumerate(column.cards)}
+
+
+def _moved_ids(before, after_by_id, after, before_by_id):
+    # Items kept in both sequences but outside their longest common ordering were moved.
+    before_ids = [item.id for item in before if item.id in after_by_id]
+    after_ids = [item.id for item in after if item.id in before_by_id]
+    if before_ids == after_ids:
+        return []
+    in_order = set()
+    for block in SequenceMatcher(None, before_ids, after_ids, autojunk=False).get_matching_blocks():
+        in_order.update(before_ids[block.a:block.a + block.size])
+    return [item_id for item_id in after_ids if item_id not in in_order]
+
+
+def _edited_fields(before, after):
+    edited = {}
+    if before.title != after.title:
+        edited["title"] = {"from": before.title, "to": after.title}
+    if before.content != after.content:
+        edited["content"] = {"from": before.content, "to": after.content}
+    return edited
@@ -0,0 +1,22 @@
+from uuid import UUID
+
+
+def first_retained_version(app, board_id: UUID) -> int:
+    # Compaction keeps the creation event and every event from its baseline on.
+    events = list(app.events.get(board_id, gt=1, limit=1))
+    return events[0].originator_version if events else 2
+
+
+def check_versions_retained(app, board_id: UUID, *versions):
+    first_version = first_retained_version(app, board_id)
+    for version in versions:
+        if version is not None and 1 < version < first_version:
+            raise ValueError(f"Version {version} was compacted, the earliest available version is {first_version}")
+
+
+def check_range_retained(app, board_id: UUID, from_version, to_version):
+    # A range reaching into the compacted versions would skip them without notice.
+    first_version = first_retained_version(app, board_id)
+    compacted = first_version > 2
+    if compacted and from_version is not None and from_version < first_version and (to_version or 2) > 1:
+        raise ValueError(f"Versions before {first_version} were compacted")
@@ -0,0 +1,5 @@
+from .board_documents import IMPORT_CHUNK_SIZE
+from .board_documents import chunk_columns
+from .board_documents import columns_as_dicts
+from .board_documents import iter_board_history_ndjson
+from .board_documents import parse_board_document
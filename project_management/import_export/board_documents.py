@@ -0,0 +1,114 @@
+import json
+from datetime import datetime
+from uuid import UUID, uuid4
+
+IMPORT_CHUNK_SIZE = 1000
+
+_EVENT_METADATA = ("originator_id", "originator_version", "originator_topic", "timestamp")
+
+
+def parse_board_document(document: dict):
+    board = document.get("board", document)
+    if not isinstance(board, dict):
+        raise ValueError("Board document must be an object")
+
+    columns = []
+    for column in _parse_objects(board, "columns"):
+        columns.append({
+            "id": _parse_id(column.get("id")),
+            "title": _parse_text(column, "title"),
+            "cards": [
+                {
+                    "id": _parse_id(card.get("id")),
+                    "title": _parse_text(card, "title"),
+                    "content": _parse_text(card, "content")
+                }
+                for card in _parse_objects(column, "cards")
+            ],
+        })
+
+    column_ids = [column["id"] for column in columns]
+    card_ids = [card["id"] for column in columns for card in column["cards"]]
+    if len(set(column_ids)) != len(column_ids) or len(set(card_ids)) != len(card_ids):
+        raise ValueError("Board document contains duplicate ids")
+
+    return _parse_text(board, "title"), columns
+
+
+def columns_as_dicts(columns):
+    return [
+        {
+            "id": column.id,
+            "title": column.title,
+            "cards": [{"id": card.id, "title": card.title, "content": card.content} for card in column.cards],
+        }
+        for column in columns
+    ]
+
+
+def chunk_columns(columns, chunk_size=IMPORT_CHUNK_SIZE):
+    # The first chunk carries every column and as many cards as fit, the rest are card batches.
+    first_chunk = []
+    card_chunks = []
+    budget = chunk_size
+    for column in columns:
+        cards = column["cards"]
+        first_chunk.append({**column, "cards": cards[:budget]})
+        remaining = cards[budget:]
+        budget = max(0, budget - len(cards))
+        for i in range(0, len(remaining), chunk_size):
+            card_chunks.append((column["id"], remaining[i:i + chunk_size]))
+    return first_chunk, card_chunks
+
+
+def iter_board_history_ndjson(app, board_id: UUID, page_size=500, from_version=None, to_version=None):
+    gt = None if from_version is None else from_version - 1
+    while True:
+        events = list(app.events.get(board_id, gt=gt, lte=to_version, limit=page_size))
+        for domain_event in events:
+            yield json.dumps(_event_as_dict(domain_event), default=_json_default) + "\n"
+        if len(events) < page_size:
+            return
+        gt = events[-1].originator_version
+
+
+def _event_as_dict(domain_event):
+    return {
+        "version": domain_event.originator_version,
+        "event": type(domain_event).__name__,
+        "timestamp": domain_event.timestamp,
+        "data": {k: v for k, v in domain_event.__dict__.items() if k not in _EVENT_METADATA},
+    }
+
+
+def _json_default(obj):
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _parse_id(value):
+    if value is None:
+        return uuid4()
+    try:
+        return UUID(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid id in board document: {value!r}") from None
+
+
+def _parse_objects(item, key):
+    values = item.get(key) or []
+    if not isinstance(values, list) or not all(isinstance(value, dict) for value in values):
+        raise ValueError(f"Board document field '{key}' must be a list of objects")
+    return values
+
+
+def _parse_text(item, key):
+    value = item.get(key) or ""
+    if not isinstance(value, str):
+        raise ValueError(f"Board document field '{key}' must be a string")
+    return value
@@ -0,0 +1,9 @@
+from .board_rebuilder import list_board_ids
+from .board_rebuilder import rebuild_board
+from .board_rebuilder import rebuild_boards
+from .board_rebuilder import verify_board
+from .history_compactor import compact_board
+from .history_compactor import compact_boards
+from .history_compactor import read_archive
+from .warm_up import recently_active_board_ids
+from .warm_up import warm_up_boards
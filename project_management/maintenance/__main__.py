@@ -0,0 +1,14 @@
+import sys
+
+from project_management.maintenance import board_rebuilder, history_compactor
+
+COMMANDS = {
+    "rebuild": board_rebuilder.main,
+    "compact": history_compactor.main,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(f"usage: python -m project_management.maintenance {{{','.join(COMMANDS)}}} [options]")
+        sys.exit(2)
+    sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
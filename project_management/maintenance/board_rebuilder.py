@@ -0,0 +1,179 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from uuid import UUID
+
+from eventsourcing.utils import get_topic
+
+from project_management.domain_model import Board
+from project_management.project_management_app import ProjectManagementApp
+
+BOARD_CREATED_TOPIC = get_topic(Board.BOARD_CREATED)
+
+_worker_app = None
+
+
+class BoardRebuildResult:
+
+    def __init__(self, board_id, problems, snapshots_written=0):
+        self.board_id = board_id
+        self.problems = problems
+        self.snapshots_written = snapshots_written
+
+    @property
+    def ok(self):
+        return not self.problems
+
+
+class RebuildReport:
+
+    def __init__(self):
+        self.boards_checked = 0
+        self.snapshots_written = 0
+        self.failures = {}
+        self.elapsed_seconds = 0.0
+
+    def add(self, result: BoardRebuildResult):
+        self.boards_checked += 1
+        self.snapshots_written += result.snapshots_written
+        if not result.ok:
+            self.failures[result.board_id] = result.problems
+
+    @property
+    def boards_per_second(self):
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.boards_checked / self.elapsed_seconds
+
+
+def list_board_ids(app, page_size=1000):
+    board_ids = []
+    start = 1
+    while True:
+        notifications = app.recorder.select_notifications(start, page_size, topics=[BOARD_CREATED_TOPIC])
+        board_ids.extend(notification.originator_id for notification in notifications)
+        if len(notifications) < page_size:
+            return board_ids
+        start = notifications[-1].id + 1
+
+
+def verify_board(app, board_id: UUID) -> list:
+    problems = []
+    board = app.repository.get(board_id)
+
+    if board.undo_redo_tracker_id is None:
+        return [f"board {board_id} has no undo redo tracker"]
+
+    tracker = app.repository.get(board.undo_redo_tracker_id)
+    if tracker.board_id != board_id:
+        problems.append(f"tracker {tracker.id} belongs to board {tracker.board_id}")
+
+    strategy = tracker.strategy
+    min_version = strategy.get_min_version()
+    version_cursor = strategy.get_version_cursor()
+    if not min_version <= version_cursor <= board.version:
+        problems.append(f"version cursor {version_cursor} outside [{min_version}, {board.version}]")
+
+    for reference_version, commit_version in strategy.get_undo_commit_pairs():
+        if not min_version <= reference_version < commit_version <= board.version:
+            problems.append(f"undo commit ({reference_version}, {commit_version}) outside "
+                            f"[{min_version}, {board.version}]")
+
+    try:
+        app.repository.get(board_id, version=version_cursor)
+    except Exception as e:
+        problems.append(f"active version {version_cursor} does not reconstruct: {e!r}")
+
+    column_ids = [column.id for column in board.columns]
+    if len(column_ids) != len(set(column_ids)):
+        problems.append("duplicate column ids")
+    card_ids = [card.id for column in board.columns for card in column.cards]
+    if len(card_ids) != len(set(card_ids)):
+        problems.append("duplicate card ids")
+
+    return problems
+
+
+def write_fresh_snapshot(app, aggregate_id: UUID) -> bool:
+    aggregate = app.repository.get(aggregate_id)
+    latest_snapshots = list(app.snapshots.get(aggregate_id, desc=True, limit=1))
+    if latest_snapshots and latest_snapshots[0].originator_version >= aggregate.version:
+        return False
+    app.take_snapshot(aggregate_id, version=aggregate.version)
+    return True
+
+
+def rebuild_board(app, board_id: UUID, write_snapshots=False) -> BoardRebuildResult:
+    try:
+        problems = verify_board(app, board_id)
+    except Exception as e:
+        return BoardRebuildResult(board_id, [f"board does not reconstruct: {e!r}"])
+
+    snapshots_written = 0
+    if write_snapshots and not problems:
+        board = app.repository.get(board_id)
+        for aggregate_id in (board_id, board.undo_redo_tracker_id):
+            try:
+                snapshots_written += write_fresh_snapshot(app, aggregate_id)
+            except Exception as e:
+                # For example a live server saving the same snapshot version first.
+                problems.append(f"snapshot of {aggregate_id} not written: {e!r}")
+    return BoardRebuildResult(board_id, problems, snapshots_written)
+
+
+def _init_worker(env):
+    global _worker_app
+    _worker_app = ProjectManagementApp(env=env)
+
+
+def _rebuild_chunk(board_ids, write_snapshots):
+    return [rebuild_board(_worker_app, board_id, write_snapshots) for board_id in board_ids]
+
+
+def rebuild_boards(env, board_ids, workers=None, chunk_size=50, write_snapshots=False, on_progress=None):
+    report = RebuildReport()
+    started = time.perf_counter()
+    chunks = [board_ids[i:i + chunk_size] for i in range(0, len(board_ids), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(env,)) as executor:
+        futures = [executor.submit(_rebuild_chunk, chunk, write_snapshots) for chunk in chunks]
+        for future in as_completed(futures):
+            for result in future.result():
+                report.add(result)
+            report.elapsed_seconds = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(report)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m project_management.maintenance rebuild",
+        description="Replay every board in parallel and verify it and its undo redo tracker.")
+    parser.add_argument("--db", default="events.db", help="SQLite database to rebuild (default: events.db)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="boards handed to a worker at a time")
+    parser.add_argument("--write-snapshots", action="store_true",
+                        help="write a fresh snapshot of each healthy board and tracker")
+    args = parser.parse_args(argv)
+
+    env = {"PERSISTENCE_MODULE": "eventsourcing.sqlite", "SQLITE_DBNAME": args.db}
+    _init_worker(env)
+    board_ids = list_board_ids(_worker_app)
+    print(f"rebuilding {len(board_ids)} boards from {args.db}")
+
+    def on_progress(progress):
+        print(f"  {progress.boards_checked}/{len(board_ids)} boards, "
+              f"{progress.boards_per_second:.1f} boards/s, {len(progress.failures)} failures")
+
+    report = rebuild_boards(env, board_ids, args.workers, args.chunk_size, args.write_snapshots, on_progress)
+
+    for board_id, problems in report.failures.items():
+        for problem in problems:
+            print(f"FAIL {board_id}: {problem}")
+    print(f"checked {report.boards_checked} boards in {report.elapsed_seconds:.2f}s "
+          f"({report.boards_per_second:.1f} boards/s), wrote {report.snapshots_written} snapshots, "
+          f"{len(report.failures)} failures")
+    return 1 if report.failures else 0
@@ -0,0 +1,141 @@
+import argparse
+import base64
+import json
+import os
+import time
+from uuid import UUID
+
+from eventsourcing.sqlite import SQLiteAggregateRecorder
+
+from project_management.maintenance.board_rebuilder import list_board_ids
+from project_management.project_management_app import ProjectManagementApp
+
+
+class CompactionResult:
+
+    def __init__(self, board_id, baseline_version=None, events_archived=0, snapshots_archived=0):
+        self.board_id = board_id
+        self.baseline_version = baseline_version
+        self.events_archived = events_archived
+        self.snapshots_archived = snapshots_archived
+
+    @property
+    def compacted(self):
+        return self.baseline_version is not None
+
+
+def compute_baseline_version(board, tracker, undo_horizon: int):
+    # The baseline never passes the active cursor. An undo commit whose reference falls
+    # below the baseline pushes it up to the commit, as undoing past it needs the reference.
+    strategy = tracker.strategy
+    baseline_version = min(board.version - undo_horizon, strategy.get_version_cursor())
+    for reference_version, commit_version in strategy.get_undo_commit_pairs():
+        if reference_version < baseline_version <= commit_version:
+            baseline_version = commit_version
+    baseline_version = min(baseline_version, strategy.get_version_cursor())
+    if baseline_version <= strategy.get_min_version():
+        return None
+    return baseline_version
+
+
+def compact_board(app, board_id: UUID, undo_horizon: int, archive_file) -> CompactionResult:
+    board = app.repository.get(board_id)
+    tracker = app.repository.get(board.undo_redo_tracker_id)
+    baseline_version = compute_baseline_version(board, tracker, undo_horizon)
+    if baseline_version is None:
+        return CompactionResult(board_id)
+
+    _ensure_snapshot_at(app, board_id, baseline_version)
+    tracker.advance_undo_horizon(baseline_version)
+    app.save(tracker)
+    _ensure_snapshot_at(app, tracker.id, tracker.version)
+
+    result = CompactionResult(board_id, baseline_version)
+    for aggregate_id, keep_from_version in ((board_id, baseline_version), (tracker.id, tracker.version)):
+        result.events_archived += _archive_and_delete(app.events.recorder, aggregate_id,
+                                                      keep_from_version, archive_file)
+        result.snapshots_archived += _archive_and_delete(app.snapshots.recorder, aggregate_id,
+                                                         keep_from_version, archive_file)
+    return result
+
+
+def compact_boards(app, undo_horizon: int, archive_path, board_ids=None, on_progress=None):
+    if board_ids is None:
+        board_ids = list_board_ids(app)
+    results = []
+    with open(archive_path, "a", encoding="utf-8") as archive_file:
+        for board_id in board_ids:
+            result = compact_board(app, board_id, undo_horizon, archive_file)
+            results.append(result)
+            if on_progress is not None:
+                on_progress(result)
+    return results
+
+
+def read_archive(archive_path):
+    with open(archive_path, encoding="utf-8") as archive_file:
+        for line in archive_file:
+            record = json.loads(line)
+            record["originator_id"] = UUID(record["originator_id"])
+            record["state"] = base64.b64decode(record["state"])
+            yield record
+
+
+def _ensure_snapshot_at(app, aggregate_id: UUID, version: int):
+    snapshots = list(app.snapshots.get(aggregate_id, desc=True, limit=1, lte=version))
+    if not snapshots or snapshots[0].originator_version != version:
+        app.take_snapshot(aggregate_id, version=version)
+
+
+def _archive_and_delete(recorder, aggregate_id: UUID, keep_from_version: int, archive_file, page_size=1000):
+    if not isinstance(recorder, SQLiteAggregateRecorder):
+        raise TypeError(f"History compaction needs an SQLite recorder, not {type(recorder).__name__}")
+
+    # Creation events stay behind, the notification log is how boards are listed.
+    archived = 0
+    gt = 1
+    while True:
+        stored_events = recorder.select_events(aggregate_id, gt=gt, lte=keep_from_version - 1, limit=page_size)
+        for stored_event in stored_events:
+            archive_file.write(json.dumps({
+                "table": recorder.events_table_name,
+                "originator_id": str(stored_event.originator_id),
+                "originator_version": stored_event.originator_version,
+                "topic": stored_event.topic,
+                "state": base64.b64encode(stored_event.state).decode("ascii"),
+            }) + "\n")
+        archived += len(stored_events)
+        if len(stored_events) < page_size:
+            break
+        gt = stored_events[-1].originator_version
+
+    if archived:
+        # The archive must be durable before the hot copy goes away.
+        archive_file.flush()
+        os.fsync(archive_file.fileno())
+        with recorder.datastore.transaction(commit=True) as c:
+            c.execute(f"DELETE FROM {recorder.events_table_name} "
+                      "WHERE originator_id=? AND originator_version>1 AND originator_version<?",
+                      (aggregate_id.hex, keep_from_version))
+    return archived
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m project_management.maintenance compact",
+        description="Fold board history beyond the undo horizon into baseline snapshots "
+                    "and move it to an append-only archive.")
+    parser.add_argument("--db", default="events.db", help="SQLite database to compact (default: events.db)")
+    parser.add_argument("--undo-horizon", type=int, required=True,
+                        help="number of most recent board versions that stay undoable")
+    parser.add_argument("--archive", required=True, help="NDJSON file that archived events are appended to")
+    args = parser.parse_args(argv)
+
+    app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.sqlite", "SQLITE_DBNAME": args.db})
+    started = time.perf_counter()
+    results = compact_boards(app, args.undo_horizon, args.archive)
+    compacted = [result for result in results if result.compacted]
+    print(f"compacted {len(compacted)} of {len(results)} boards in {time.perf_counter() - started:.2f}s, "
+          f"archived {sum(r.events_archived for r in compacted)} events and "
+          f"{sum(r.snapshots_archived for r in compacted)} snapshots to {args.archive}")
+    return 0
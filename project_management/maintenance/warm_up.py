@@ -0,0 +1,67 @@
+import logging
+from uuid import UUID
+
+from eventsourcing.utils import get_topic
+
+from project_management.domain_model import Board
+from project_management.maintenance.board_rebuilder import write_fresh_snapshot
+from project_management.undo_redo.undo_redo_state_manager import UndoRedoTracker
+
+logger = logging.getLogger(__name__)
+
+BOARD_TOPIC_PREFIX = get_topic(Board) + "."
+TRACKER_TOPIC_PREFIX = get_topic(UndoRedoTracker) + "."
+
+
+def recently_active_board_ids(app, limit, max_notifications=10000, page_size=500) -> list:
+    # Walks the notification log backwards, undo and redo only write tracker events.
+    board_ids = []
+    tracker_board_ids = {}
+    stop = app.recorder.max_notification_id()
+    scanned = 0
+    while stop >= 1 and scanned < max_notifications and len(board_ids) < limit:
+        start = max(1, stop - page_size + 1)
+        notifications = app.recorder.select_notifications(start, page_size, stop=stop)
+        for notification in reversed(notifications):
+            if notification.topic.startswith(BOARD_TOPIC_PREFIX):
+                board_id = notification.originator_id
+            elif notification.topic.startswith(TRACKER_TOPIC_PREFIX):
+                tracker_id = notification.originator_id
+                if tracker_id not in tracker_board_ids:
+                    tracker_board_ids[tracker_id] = app.repository.get(tracker_id).board_id
+                board_id = tracker_board_ids[tracker_id]
+            else:
+                continue
+            if board_id not in board_ids:
+                board_ids.append(board_id)
+                if len(board_ids) == limit:
+                    break
+        scanned += stop - start + 1
+        stop = start - 1
+    return board_ids
+
+
+def warm_up_board(app, board_id: UUID) -> int:
+    board = app.repository.get(board_id)
+    app.undo_redo_state_manager.board_id_to_undo_redo_tracker_id[board_id] = board.undo_redo_tracker_id
+    snapshots_written = write_fresh_snapshot(app, board_id)
+    snapshots_written += write_fresh_snapshot(app, board.undo_redo_tracker_id)
+    for _ in app.render_board(board_id):
+        pass
+    return snapshots_written
+
+
+def warm_up_boards(app, limit, max_notifications=10000) -> int:
+    """
+    Snapshots the most recently active boards and their trackers and fills the
+    renderer's fragment cache, so their first requests after a start don't replay
+    their history. Returns the number of boards warmed.
+    """
+    warmed = 0
+    for board_id in recently_active_board_ids(app, limit, max_notifications):
+        try:
+            warm_up_board(app, board_id)
+            warmed += 1
+        except Exception:
+            logger.exception("Could not warm up board %s", board_id)
+    return warmed
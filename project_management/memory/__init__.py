@@ -0,0 +1,5 @@
+from .aggregate_caches import BoardVersionCache
+from .aggregate_caches import TrackerCache
+from .memory_governor import MemoryGovernor
+from .size_estimation import BoardSizeEstimator
+from .size_estimation import estimate_size
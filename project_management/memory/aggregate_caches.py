@@ -0,0 +1,92 @@
+import copy
+from threading import Lock
+from uuid import UUID
+
+from eventsourcing.application import project_aggregate
+from eventsourcing.domain import OriginatorVersionError
+
+from project_management.memory.memory_governor import MemoryGovernor
+from project_management.memory.size_estimation import BoardSizeEstimator, estimate_size
+
+
+class BoardVersionCache:
+    """
+    Boards by (board_id, version). A stored version never changes, so entries stay
+    valid; callers must treat the returned boards as read-only. Entries are keyed by
+    the version actually loaded, which is older than the one asked for while a
+    command's cursor has moved ahead of its saved board.
+    """
+    CACHE_NAME = "boards"
+
+    def __init__(self, memory_governor: MemoryGovernor):
+        self.memory_governor = memory_governor
+        self.size_estimator = BoardSizeEstimator()
+        self._boards = {}
+        self._lock = Lock()
+        memory_governor.register(self.CACHE_NAME, self._evict)
+
+    def get(self, board_id: UUID, version: int, load):
+        key = (board_id, version)
+        with self._lock:
+            board = self._boards.get(key)
+        if board is not None:
+            self.memory_governor.touch(self.CACHE_NAME, key)
+            return board
+
+        board = load()
+        key = (board_id, board.version)
+        with self._lock:
+            self._boards[key] = board
+        self.memory_governor.charge(self.CACHE_NAME, key, board_id, self.size_estimator.estimate(board))
+        return board
+
+    def size(self, board_id: UUID, version: int):
+        # The estimated size of a cached board version, None when it is not cached.
+        return self.memory_governor.size_of(self.CACHE_NAME, (board_id, version))
+
+    def _evict(self, key):
+        with self._lock:
+            self._boards.pop(key, None)
+
+
+class TrackerCache:
+    """
+    Undo/redo trackers by id, brought up to date with the events saved since they
+    were cached. Callers get their own copy, which they may change and save.
+    """
+    CACHE_NAME = "trackers"
+
+    def __init__(self, memory_governor: MemoryGovernor):
+        self.memory_governor = memory_governor
+        self._trackers = {}
+        self._lock = Lock()
+        memory_governor.register(self.CACHE_NAME, self._evict)
+
+    def get(self, app, tracker_id: UUID):
+        with self._lock:
+            cached = self._trackers.get(tracker_id)
+        if cached is None:
+            tracker = app.repository.get(tracker_id)
+        else:
+            self.memory_governor.touch(self.CACHE_NAME, tracker_id)
+            try:
+                tracker = project_aggregate(copy.deepcopy(cached), app.events.get(tracker_id, gt=cached.version))
+            except OriginatorVersionError:
+                # Compaction removed events the cached copy had not seen yet.
+                tracker = app.repository.get(tracker_id)
+
+        if cached is None or tracker.version > cached.version:
+            self._put(tracker_id, copy.deepcopy(tracker))
+        return tracker
+
+    def _put(self, tracker_id, tracker):
+        with self._lock:
+            cached = self._trackers.get(tracker_id)
+            if cached is not None and cached.version >= tracker.version:
+                return
+            self._trackers[tracker_id] = tracker
+        self.memory_governor.charge(self.CACHE_NAME, tracker_id, tracker.board_id, estimate_size(tracker))
+
+    def _evict(self, tracker_id):
+        with self._lock:
+            self._trackers.pop(tracker_id, None)
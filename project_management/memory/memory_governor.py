@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from threading import Lock
+
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+
+class MemoryGovernor:
+    """
+    Accounts the estimated size of every entry held by the registered caches against
+    one byte budget, per cache and per board. When the budget is exceeded it evicts
+    the largest of the eviction_window least recently used entries, so one big board
+    frees the space of many small ones.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, eviction_window=8):
+        self.budget_bytes = budget_bytes
+        self.eviction_window = eviction_window
+        self.used_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._board_bytes = {}
+        self._cache_bytes = {}
+        self._evictors = {}
+        self._lock = Lock()
+
+    def register(self, cache_name, evict):
+        self._evictors[cache_name] = evict
+        self._cache_bytes.setdefault(cache_name, 0)
+
+    def charge(self, cache_name, key, board_id, size):
+        # Evictions run after the lock is released, caches call in without holding theirs.
+        with self._lock:
+            self._remove((cache_name, key))
+            self._add((cache_name, key), board_id, size)
+            victims = self._select_victims()
+        for victim_cache_name, victim_key in victims:
+            self._evictors[victim_cache_name](victim_key)
+
+    def touch(self, cache_name, key):
+        with self._lock:
+            if (cache_name, key) in self._entries:
+                self._entries.move_to_end((cache_name, key))
+
+    def size_of(self, cache_name, key):
+        with self._lock:
+            entry = self._entries.get((cache_name, key))
+        return None if entry is None else entry[1]
+
+    def release(self, cache_name, key):
+        with self._lock:
+            self._remove((cache_name, key))
+
+    def usage_by_cache(self) -> dict:
+        with self._lock:
+            return dict(self._cache_bytes)
+
+    def largest_boards(self, limit=10) -> list:
+        with self._lock:
+            return sorted(self._board_bytes.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+    def _add(self, entry_key, board_id, size):
+        self._entries[entry_key] = (board_id, size)
+        self.used_bytes += size
+        self._board_bytes[board_id] = self._board_bytes.get(board_id, 0) + size
+        self._cache_bytes[entry_key[0]] = self._cache_bytes.get(entry_key[0], 0) + size
+
+    def _remove(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        board_id, size = entry
+        self.used_bytes -= size
+        self._cache_bytes[entry_key[0]] -= size
+        self._board_bytes[board_id] -= size
+        if not self._board_bytes[board_id]:
+            del self._board_bytes[board_id]
+
+    def _select_victims(self):
+        victims = []
+        while self.used_bytes > self.budget_bytes and self._entries:
+            window = []
+            for entry_key in self._entries:
+                window.append(entry_key)
+                if len(window) == self.eviction_window:
+                    break
+            victim = max(window, key=lambda entry_key: self._entries[entry_key][1])
+            self._remove(victim)
+            victims.append(victim)
+            self.evictions += 1
+        return victims
@@ -0,0 +1,74 @@
+import sys
+from collections import OrderedDict
+from enum import Enum
+from uuid import uuid4
+
+# Enum members are shared singletons, following them would count their classes.
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, bool, complex, type(None), Enum)
+
+
+def estimate_size(obj) -> int:
+    # Deep size in bytes; objects reachable twice are counted once.
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, type):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, _ATOMIC_TYPES):
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            if hasattr(item, "__dict__"):
+                stack.append(vars(item))
+            for cls in type(item).__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    if name != "__weakref__" and hasattr(item, name):
+                        stack.append(getattr(item, name))
+    return size
+
+
+_UUID_SIZE = estimate_size(uuid4())
+
+
+class BoardSizeEstimator:
+    """
+    Estimates a Board's size from its columns and cards, remembering the size of
+    each board's column versions, least recently used first out, so a new board
+    version only costs its changed columns.
+    """
+
+    def __init__(self, max_columns=4096):
+        self.max_columns = max_columns
+        self._column_sizes = OrderedDict()
+
+    def estimate(self, board) -> int:
+        size = estimate_size({k: v for k, v in vars(board).items() if k != "columns"})
+        size += sys.getsizeof(board) + sys.getsizeof(board.columns)
+        for column in board.columns:
+            size += self._column_size(board.id, column)
+        return size
+
+    def _column_size(self, board_id, column) -> int:
+        # Column ids are chosen by clients and may repeat across boards.
+        key = (board_id, column.id, column.modified_version)
+        size = self._column_sizes.get(key) if column.modified_version is not None else None
+        if size is not None:
+            self._column_sizes.move_to_end(key)
+        else:
+            size = (sys.getsizeof(column) + _UUID_SIZE + sys.getsizeof(column.title)
+                    + sys.getsizeof(column.cards))
+            for card in column.cards:
+                size += sys.getsizeof(card) + _UUID_SIZE + sys.getsizeof(card.title) + sys.getsizeof(card.content)
+            if column.modified_version is not None:
+                self._column_sizes[key] = size
+                while len(self._column_sizes) > self.max_columns:
+                    self._column_sizes.popitem(last=False)
+        return size
@@ -0,0 +1,3 @@
+from .instrumentation import InstrumentedRepository
+from .instrumentation import instrument_sqlite_datastore
+from .metrics import Metrics
@@ -0,0 +1,58 @@
+from eventsourcing.application import Repository, project_aggregate
+from eventsourcing.domain import Snapshot
+
+from project_management.metrics.metrics import COUNT_BUCKETS
+
+
+class InstrumentedRepository(Repository):
+    # Only installed while metrics are enabled, so the default repository stays untouched.
+
+    def __init__(self, metrics, repository: Repository):
+        super().__init__(
+            repository.event_store,
+            snapshot_store=repository.snapshot_store,
+            fastforward=repository.fastforward,
+            fastforward_skipping=repository.fastforward_skipping,
+            deepcopy_from_cache=repository.deepcopy_from_cache,
+        )
+        self.cache = repository.cache
+        self.metrics = metrics
+
+    def get(self, aggregate_id, *, projector_func=project_aggregate, **kwargs):
+        replay = _CountingProjector(projector_func)
+        aggregate = super().get(aggregate_id, projector_func=replay, **kwargs)
+        aggregate_type = type(aggregate).__name__
+        self.metrics.observe("repository_events_replayed", replay.events_replayed, COUNT_BUCKETS,
+                             aggregate=aggregate_type)
+        self.metrics.increment("repository_get_total", aggregate=aggregate_type,
+                               snapshot="hit" if replay.snapshot_hit else "miss")
+        return aggregate
+
+
+class _CountingProjector:
+
+    def __init__(self, projector_func):
+        self.projector_func = projector_func
+        self.events_replayed = 0
+        self.snapshot_hit = False
+
+    def __call__(self, initial, events):
+        return self.projector_func(initial, self._count(events))
+
+    def _count(self, events):
+        for domain_event in events:
+            if isinstance(domain_event, Snapshot):
+                self.snapshot_hit = True
+            else:
+                self.events_replayed += 1
+            yield domain_event
+
+
+def instrument_sqlite_datastore(datastore, metrics):
+    transaction = datastore.transaction
+
+    def counted_transaction(*, commit):
+        metrics.increment("sqlite_transactions_total", kind="write" if commit else "read")
+        return transaction(commit=commit)
+
+    datastore.transaction = counted_transaction
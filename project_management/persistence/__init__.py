@@ -0,0 +1,2 @@
+from .write_behind import WriteBehindFactory
+from .write_behind import WriteBehindError
@@ -0,0 +1,209 @@
+"""
+Keeps the whole event store in memory and writes it behind to SQLite.
+
+Select it with PERSISTENCE_MODULE=project_management.persistence:WriteBehindFactory
+and SQLITE_DBNAME. Saves return once the events are in memory; a background thread
+writes them to SQLite at least every WRITE_BEHIND_INTERVAL seconds (default 0.1), so
+a crash loses at most that window. Saves block once WRITE_BEHIND_MAX_PENDING events
+(default 10000) are waiting to be written. A failed write is retried with a doubling
+delay; after WRITE_BEHIND_MAX_RETRIES (default 5) failures in a row the writer stops
+and every later save or flush raises WriteBehindError. Each write is a single transaction over
+everything pending in save order, so the database always holds a consistent prefix
+of the history and on startup the memory store is reloaded from it.
+"""
+import logging
+from threading import Condition, Lock, Thread
+from uuid import UUID
+
+from eventsourcing.persistence import InfrastructureFactory, StoredEvent
+from eventsourcing.popo import POPOAggregateRecorder, POPOApplicationRecorder
+from eventsourcing.sqlite import Factory as SQLiteFactory
+
+logger = logging.getLogger(__name__)
+
+LOAD_PAGE_SIZE = 10000
+MAX_RETRY_DELAY = 30.0
+
+
+class WriteBehindError(Exception):
+    pass
+
+
+class WriteBehindWriter:
+
+    def __init__(self, datastore, interval=0.1, max_pending=10000, max_retries=5):
+        self.datastore = datastore
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._failure = None
+        self._pending = []
+        self._pending_count = 0
+        self._condition = Condition()
+        self._flush_lock = Lock()
+        self._closed = False
+        self._thread = Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending_count(self):
+        return self._pending_count
+
+    def wait_for_capacity(self):
+        with self._condition:
+            self._check_failure()
+            while self._pending_count >= self.max_pending and not self._closed:
+                self._condition.notify_all()
+                self._condition.wait()
+                self._check_failure()
+
+    def enqueue(self, sqlite_recorder, stored_events):
+        with self._condition:
+            self._check_failure()
+            self._pending.append((sqlite_recorder, stored_events))
+            self._pending_count += len(stored_events)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._condition:
+                self._check_failure()
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                with self.datastore.transaction(commit=True) as c:
+                    for sqlite_recorder, stored_events in batch:
+                        sqlite_recorder._insert_events(c, stored_events)
+            except Exception:
+                with self._condition:
+                    self._pending[:0] = batch
+                raise
+            written = sum(len(stored_events) for _, stored_events in batch)
+            with self._condition:
+                self._pending_count -= written
+                self._condition.notify_all()
+            return written
+
+    def discard(self):
+        # Drops the writes not flushed yet, as a crash would.
+        with self._flush_lock, self._condition:
+            discarded, self._pending, self._pending_count = self._pending_count, [], 0
+            self._condition.notify_all()
+        return discarded
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        failures = 0
+        while True:
+            delay = min(self.interval * 2 ** failures, max(self.interval, MAX_RETRY_DELAY))
+            with self._condition:
+                if self._closed:
+                    return
+                self._condition.wait(delay)
+            try:
+                self.flush()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                if failures > self.max_retries:
+                    logger.exception("Write-behind flush failed %d times, giving up", failures)
+                    with self._condition:
+                        self._failure = WriteBehindError(f"Writing to SQLite failed {failures} times: {e}")
+                        self._failure.__cause__ = e
+                        self._condition.notify_all()
+                    return
+                logger.exception("Write-behind flush failed, retrying")
+
+    def _check_failure(self):
+        if self._failure is not None:
+            raise self._failure
+
+
+class _WriteBehindRecorderMixin:
+
+    def __init__(self, sqlite_recorder, writer: WriteBehindWriter):
+        super().__init__()
+        self.sqlite_recorder = sqlite_recorder
+        self.writer = writer
+
+    def _insert_events(self, stored_events, **kwargs):
+        self.writer.wait_for_capacity()
+        with self._database_lock:
+            self._assert_uniqueness(stored_events, **kwargs)
+            notification_ids = self._update_table(stored_events, **kwargs)
+            self.writer.enqueue(self.sqlite_recorder, stored_events)
+            return notification_ids
+
+    def _load(self, stored_events):
+        with self._database_lock:
+            self._update_table(stored_events)
+
+
+class WriteBehindAggregateRecorder(_WriteBehindRecorderMixin, POPOAggregateRecorder):
+
+    def load(self):
+        with self.writer.datastore.transaction(commit=False) as c:
+            c.execute(f"SELECT * FROM {self.sqlite_recorder.events_table_name} "
+                      "ORDER BY originator_id, originator_version")
+            self._load([_stored_event(row) for row in c.fetchall()])
+
+
+class WriteBehindApplicationRecorder(_WriteBehindRecorderMixin, POPOApplicationRecorder):
+
+    def load(self):
+        start = 1
+        while True:
+            notifications = self.sqlite_recorder.select_notifications(start, LOAD_PAGE_SIZE)
+            self._load([StoredEvent(n.originator_id, n.originator_version, n.topic, n.state)
+                        for n in notifications])
+            if len(notifications) < LOAD_PAGE_SIZE:
+                return
+            start = notifications[-1].id + 1
+
+
+def _stored_event(row):
+    return StoredEvent(UUID(row["originator_id"]), row["originator_version"], row["topic"], row["state"])
+
+
+class WriteBehindFactory(InfrastructureFactory):
+    WRITE_BEHIND_INTERVAL = "WRITE_BEHIND_INTERVAL"
+    WRITE_BEHIND_MAX_PENDING = "WRITE_BEHIND_MAX_PENDING"
+    WRITE_BEHIND_MAX_RETRIES = "WRITE_BEHIND_MAX_RETRIES"
+
+    def __init__(self, env):
+        super().__init__(env)
+        self.sqlite_factory = SQLiteFactory(env)
+        self.datastore = self.sqlite_factory.datastore
+        self.writer = WriteBehindWriter(
+            self.sqlite_factory.datastore,
+            interval=float(self.env.get(self.WRITE_BEHIND_INTERVAL) or 0.1),
+            max_pending=int(self.env.get(self.WRITE_BEHIND_MAX_PENDING) or 10000),
+            max_retries=int(self.env.get(self.WRITE_BEHIND_MAX_RETRIES) or 5),
+        )
+
+    def aggregate_recorder(self, purpose="events"):
+        recorder = WriteBehindAggregateRecorder(self.sqlite_factory.aggregate_recorder(purpose), self.writer)
+        recorder.load()
+        return recorder
+
+    def application_recorder(self):
+        recorder = WriteBehindApplicationRecorder(self.sqlite_factory.application_recorder(), self.writer)
+        recorder.load()
+        return recorder
+
+    def process_recorder(self):
+        # Tracking records must be written with their events, so process applications
+        # write through to SQLite.
+        return self.sqlite_factory.process_recorder()
+
+    def close(self):
+        try:
+            self.writer.close()
+        finally:
+            self.sqlite_factory.close()
@@ -1,28 +1,59 @@
-import os
 from uuid import uuid4, UUID
 
-from eventsourcing.application import Application
+from eventsourcing.application import AggregateNotFoundError, Application, Repository
 from eventsourcing.persistence import Transcoder
 from typing_extensions import override
 
+from project_management.concurrency import BoardLocks, board_locked
 from project_management.domain_model import Board
-from project_management.transcoders import CardTranscoding, ColumnTranscoding
+from project_management.history import check_range_retained, diff_board_versions
+from project_management.import_export import (
+    IMPORT_CHUNK_SIZE,
+    chunk_columns,
+    columns_as_dicts,
+    iter_board_history_ndjson,
+    parse_board_document
+)
+from project_management.memory import BoardVersionCache, MemoryGovernor
+from project_management.memory.memory_governor import DEFAULT_BUDGET_BYTES
+from project_management.metrics import InstrumentedRepository, Metrics, instrument_sqlite_datastore
+from project_management.rendering import BoardRenderer
+from project_management.tracing import CommandTraceRecorder, traced_command
+from project_management.transcoders import CardTranscoding, ColumnTranscoding, UndoRedoStrategyTranscoding
 from project_management.undo_redo.undo_redo_state_manager import UndoRedoStateManager
 
 
 class ProjectManagementApp(Application):
+    env = {"PERSISTENCE_MODULE": "eventsourcing.sqlite", "SQLITE_DBNAME": "events.db"}
     is_snapshotting_enabled = True
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, env=None, metrics: Metrics = None, command_trace_recorder: CommandTraceRecorder = None):
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.command_trace_recorder = command_trace_recorder
+        super().__init__(env)
+        self.memory_governor = MemoryGovernor(int(self.env.get("CACHE_MEMORY_BUDGET") or DEFAULT_BUDGET_BYTES))
+        self.board_cache = BoardVersionCache(self.memory_governor)
         self.undo_redo_state_manager = UndoRedoStateManager(self)
+        self.board_renderer = BoardRenderer(memory_governor=self.memory_governor)
+        self.board_locks = BoardLocks()
+        if self.metrics.enabled and hasattr(self.factory, "datastore"):
+            instrument_sqlite_datastore(self.factory.datastore, self.metrics)
+
+    @override
+    def construct_repository(self) -> Repository:
+        repository = super().construct_repository()
+        if self.metrics.enabled:
+            return InstrumentedRepository(self.metrics, repository)
+        return repository
 
     @override
     def register_transcodings(self, transcoder: Transcoder):
         super().register_transcodings(transcoder)
         transcoder.register(CardTranscoding())
         transcoder.register(ColumnTranscoding())
+        transcoder.register(UndoRedoStrategyTranscoding())
 
+    @traced_command
     def create_board(self) -> UUID:
         board = Board()
         undo_redo_tracker_id = self.undo_redo_state_manager.create_undo_redo_tracker(board.id)
@@ -30,6 +61,53 @@ class ProjectManagementApp(Application):
         self.save(board)
         return board.id
 
+    @traced_command
+    def import_board(self, document: dict, chunk_size: int = IMPORT_CHUNK_SIZE) -> UUID:
+        title, columns = parse_board_document(document)
+        first_chunk, card_chunks = chunk_columns(columns, chunk_size)
+
+        board = Board()
+        board.import_board(title, first_chunk)
+        for column_id, cards in card_chunks:
+            board.import_cards(column_id, cards)
+        return self._save_populated_board(board)
+
+    @traced_command
+    def clone_board(self, source_id: UUID, version: int = None) -> UUID:
+        if version is None:
+            version = self.undo_redo_state_manager.get_version_cursor(source_id)
+        source = self.repository.get(source_id, version=version)
+
+        board = Board()
+        board.clone_board(source_id, source.version, source.title, columns_as_dicts(source.columns))
+        return self._save_populated_board(board)
+
+    def _save_populated_board(self, board: Board) -> UUID:
+        # The populated state is the oldest version the tracker can undo to, and the
+        # snapshot lets the board replay without its bulk events.
+        undo_redo_tracker_id = self.undo_redo_state_manager.create_undo_redo_tracker(
+            board.id, min_version=board.version + 1)
+        board.set_undo_redo_tracker(undo_redo_tracker_id)
+        self.save(board)
+        self.take_snapshot(board.id, version=board.version)
+        return board.id
+
+    def export_board_history(self, board_id: UUID, from_version: int = None, to_version: int = None):
+        # Checked up front, a missing board would otherwise stream as an empty history.
+        # One row is enough, compaction leaves at least a snapshot behind.
+        if not any(self.events.get(board_id, limit=1)) and not any(self.snapshots.get(board_id, limit=1)):
+            raise AggregateNotFoundError(board_id)
+        check_range_retained(self, board_id, from_version, to_version)
+        return iter_board_history_ndjson(self, board_id, from_version=from_version, to_version=to_version)
+
+    @traced_command
+    def diff_board(self, board_id: UUID, from_version: int, to_version: int = None) -> dict:
+        if to_version is None:
+            to_version = self.undo_redo_state_manager.get_version_cursor(board_id)
+        return diff_board_versions(self, board_id, from_version, to_version)
+
+    @traced_command
+    @board_locked
     def edit_board_title(self, board_id: UUID, title: str):
         board = self.repository.get(board_id)
         self.undo_redo_state_manager.commit_undo_state(board)
@@ -37,6 +115,8 @@ class ProjectManagementApp(Application):
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
 
+    @traced_command
+    @board_locked
     def edit_column_title(self, board_id: UUID, column_id: UUID, title: str):
         board = self.repository.get(board_id)
         self.undo_redo_state_manager.commit_undo_state(board)
@@ -44,6 +124,8 @@ class ProjectManagementApp(Application):
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
 
+    @traced_command
+    @board_locked
     def edit_card_title(self, board_id: UUID, column_id: UUID, card_id: UUID, title: str):
         board = self.repository.get(board_id)
         self.undo_redo_state_manager.commit_undo_state(board)
@@ -51,6 +133,8 @@ class ProjectManagementApp(Application):
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
 
+    @traced_command
+    @board_locked
     def edit_card_content(self, board_id: UUID, column_id: UUID, card_id: UUID, content: str):
         board = self.repository.get(board_id)
         self.undo_redo_state_manager.commit_undo_state(board)
@@ -58,15 +142,21 @@ class ProjectManagementApp(Application):
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
 
-    def add_column(self, board_id: UUID) -> UUID:
+    @traced_command
+    @board_locked
+    def add_column(self, board_id: UUID, column_id: UUID = None) -> UUID:
         board = self.repository.get(board_id)
+        if column_id is not None and board.contains_column(column_id):
+            return column_id
         self.undo_redo_state_manager.commit_undo_state(board)
-        column_id = uuid4()
+        column_id = column_id or uuid4()
         board.add_column(column_id)
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
         return column_id
 
+    @traced_command
+    @board_locked
     def remove_column(self, board_id: UUID, column_id: UUID):
         board = self.repository.get(board_id)
         self.undo_redo_state_manager.commit_undo_state(board)
@@ -74,6 +164,8 @@ class ProjectManagementApp(Application):
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
 
+    @traced_command
+    @board_locked
     def move_column(self, board_id: UUID, column_id: UUID, new_index: int):
         board = self.repository.get(board_id)
         self.undo_redo_state_manager.commit_undo_state(board)
@@ -81,15 +173,21 @@ class ProjectManagementApp(Application):
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
 
-    def add_card(self, board_id: UUID, column_id: UUID) -> UUID:
+    @traced_command
+    @board_locked
+    def add_card(self, board_id: UUID, column_id: UUID, card_id: UUID = None) -> UUID:
         board = self.repository.get(board_id)
+        if card_id is not None and board.contains_card(card_id):
+            return card_id
         self.undo_redo_state_manager.commit_undo_state(board)
-        card_id = uuid4()
+        card_id = card_id or uuid4()
         board.add_card(column_id, card_id)
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
         return card_id
 
+    @traced_command
+    @board_locked
     def remove_card(self, board_id: UUID, column_id: UUID, card_id: UUID):
         board = self.repository.get(board_id)
         self.undo_redo_state_manager.commit_undo_state(board)
@@ -97,34 +195,54 @@ class ProjectManagementApp(Application):
         self.save(board)
         self.undo_redo_state_manager.increment_version_cursor(board_id)
 
+    @traced_command
+    @board_locked
     def move_card(self, board_id: UUID, from_column_id: UUID, to_column_id: UUID, card_id: UUID, new_index: int):
         board = self.repository.get(board_id)
         self.undo_redo_state_manager.commit_undo_state(board)
 
+        new_events = 1
         if from_column_id != to_column_id:
             card = board.get_card(from_column_id, card_id)
             board.remove_card(from_column_id, card_id)
-            self.undo_redo_state_manager.increment_version_cursor(board_id)
-
             board.add_card(to_column_id, card.id, card.title, card.content)
-            self.undo_redo_state_manager.increment_version_cursor(board_id)
-
-            self.save(board)
+            new_events += 2
 
         board.move_card(to_column_id, card_id, new_index)
-        self.undo_redo_state_manager.increment_version_cursor(board_id)
+        # The cursor only moves once the board has those versions.
         self.save(board)
+        self.undo_redo_state_manager.increment_version_cursor(board_id, new_events)
 
+    @traced_command
+    @board_locked
     def undo(self, board_id: UUID):
         self.undo_redo_state_manager.undo(board_id)
 
+    @traced_command
+    @board_locked
     def redo(self, board_id: UUID):
         self.undo_redo_state_manager.redo(board_id)
 
+    def get_board_version(self, board_id: UUID) -> int:
+        return self.undo_redo_state_manager.get_version_cursor(board_id)
+
+    def cached_board_size(self, board_id: UUID, version: int):
+        return self.board_cache.size(board_id, version)
+
+    def _get_active_board(self, board_id: UUID, version: int = None) -> Board:
+        # Shared with other readers through the cache, never change the returned board.
+        active_version = self.get_board_version(board_id) if version is None else version
+        return self.board_cache.get(board_id, active_version,
+                                    lambda: self.repository.get(board_id, version=active_version))
+
+    @traced_command
+    def render_board(self, board_id: UUID, version: int = None):
+        board = self._get_active_board(board_id, version)
+        return self.board_renderer.render(board_id, board)
+
+    @traced_command
     def board_as_dict(self, board_id: UUID) -> dict:
-        active_version = self.undo_redo_state_manager.get_version_cursor(board_id)
-        print("rendering version: ", active_version)
-        board = self.repository.get(board_id, version=active_version)
+        board = self._get_active_board(board_id)
 
         return {
             "board": {
@@ -148,7 +266,3 @@ class ProjectManagementApp(Application):
                 "version": board.version
             }
         }
-
-
-os.environ['PERSISTENCE_MODULE'] = 'eventsourcing.sqlite'
-os.environ['SQLITE_DBNAME'] = 'events.db'
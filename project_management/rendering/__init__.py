@@ -0,0 +1 @@
+from .board_renderer import BoardRenderer
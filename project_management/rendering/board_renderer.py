@@ -0,0 +1,87 @@
+import json
+import sys
+from collections import OrderedDict
+from threading import Lock
+from uuid import UUID
+
+DEFAULT_MAX_FRAGMENTS = 4096
+
+
+class BoardRenderer:
+    """
+    Streams a board as the JSON document board_as_dict describes, caching the
+    encoded bytes of each column keyed by the board version that last changed it.
+    """
+
+    CACHE_NAME = "fragments"
+
+    def __init__(self, max_fragments=DEFAULT_MAX_FRAGMENTS, memory_governor=None):
+        self.max_fragments = max_fragments
+        self.memory_governor = memory_governor
+        self._fragments = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        if memory_governor is not None:
+            memory_governor.register(self.CACHE_NAME, self._evict)
+
+    def render(self, board_id: UUID, board):
+        yield b'{"board":{"id":%s,"title":%s,"columns":[' % (_encode(str(board_id)), _encode(board.title))
+        for i, column in enumerate(board.columns):
+            if i:
+                yield b","
+            yield self._column_fragment(board_id, column)
+        yield b'],"version":%d}}' % board.version
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._fragments)
+            self._fragments.clear()
+        if self.memory_governor is not None:
+            for key in keys:
+                self.memory_governor.release(self.CACHE_NAME, key)
+
+    def _column_fragment(self, board_id: UUID, column) -> bytes:
+        if column.modified_version is None:
+            return _encode_column(column)
+
+        key = (board_id, column.id, column.modified_version)
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if fragment is not None:
+            if self.memory_governor is not None:
+                self.memory_governor.touch(self.CACHE_NAME, key)
+            return fragment
+
+        fragment = _encode_column(column)
+        dropped = []
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self.max_fragments:
+                dropped.append(self._fragments.popitem(last=False)[0])
+        if self.memory_governor is not None:
+            for dropped_key in dropped:
+                self.memory_governor.release(self.CACHE_NAME, dropped_key)
+            self.memory_governor.charge(self.CACHE_NAME, key, board_id, sys.getsizeof(fragment))
+        return fragment
+
+    def _evict(self, key):
+        with self._lock:
+            self._fragments.pop(key, None)
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value).encode()
+
+
+def _encode_column(column) -> bytes:
+    cards = b",".join(
+        b'{"id":%s,"title":%s,"content":%s}' % (_encode(str(card.id)), _encode(card.title), _encode(card.content))
+        for card in column.cards
+    )
+    return b'{"id":%s,"title":%s,"cards":[%s]}' % (_encode(str(column.id)), _encode(column.title), cards)
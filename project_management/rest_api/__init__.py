@@ -1 +1,2 @@
-from .rest_api import app
+from .rest_api import create_app
+from .rest_api import config_from_env
@@ -1,118 +1,444 @@
+import functools
+import logging
+import os
+import time
+from contextlib import ExitStack
+from threading import Lock
 from uuid import UUID
 
-from flask import Flask, request, jsonify
+from eventsourcing.application import AggregateNotFoundError
+from eventsourcing.persistence import RecordConflictError
+from eventsourcing.utils import strtobool
+from flask import Blueprint, Flask, Response, current_app, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 
+from project_management.concurrency import AdmissionController, OverloadedError, RequestDeduplicator, SingleFlight
+from project_management.maintenance import warm_up_boards
+from project_management.metrics import Metrics
 from project_management.project_management_app import ProjectManagementApp
+from project_management.tracing import CommandTraceRecorder
+from project_management.utils import ItemNotFoundError
+
+logger = logging.getLogger(__name__)
+
+blueprint = Blueprint('project_management', __name__)
+
+DEFAULT_CONFIG = {
+    "EVENTSOURCING_ENV": None,
+    "METRICS_ENABLED": False,
+    "COMMAND_TRACE_PATH": None,
+    "COMMAND_TRACE_ANONYMIZE": True,
+    "WARM_UP_BOARDS": 0,
+    "REQUEST_DEDUP_ENTRIES": 10000,
+    "ADMISSION_MAX_CONCURRENT": 16,
+    "ADMISSION_WRITE_RESERVED": 4,
+    "ADMISSION_READS_PER_BOARD": 2,
+    "ADMISSION_MAX_QUEUED": 64,
+    "ADMISSION_QUEUE_TIMEOUT": 1.0,
+    "ADMISSION_RETRY_AFTER": 1,
+    "READ_COALESCE_MAX_BYTES": 1024 * 1024,
+    "CORS_ORIGINS": ["http://localhost:5173", "http://127.0.0.1:5173"],
+}
+
+
+class LazyProjectManagementApp:
+    """
+    Builds the ProjectManagementApp, and with it the persistence, on first use
+    rather than when the Flask app is created.
+    """
+
+    def __init__(self, config: dict, metrics: Metrics):
+        self.config = config
+        self.metrics = metrics
+        self.request_deduplicator = RequestDeduplicator(config["REQUEST_DEDUP_ENTRIES"])
+        self.admission_controller = AdmissionController(
+            max_concurrent=config["ADMISSION_MAX_CONCURRENT"],
+            reserved_for_writes=config["ADMISSION_WRITE_RESERVED"],
+            max_reads_per_board=config["ADMISSION_READS_PER_BOARD"],
+            max_queued=config["ADMISSION_MAX_QUEUED"],
+            queue_timeout=config["ADMISSION_QUEUE_TIMEOUT"],
+            retry_after=config["ADMISSION_RETRY_AFTER"])
+        self.read_coalescer = SingleFlight()
+        self._app_instance = None
+        self._lock = Lock()
+
+    def get(self) -> ProjectManagementApp:
+        if self._app_instance is None:
+            with self._lock:
+                if self._app_instance is None:
+                    self._app_instance = self._construct()
+        return self._app_instance
+
+    def _construct(self):
+        command_trace_recorder = None
+        if self.config["COMMAND_TRACE_PATH"]:
+            command_trace_recorder = CommandTraceRecorder.open(
+                self.config["COMMAND_TRACE_PATH"], anonymize=self.config["COMMAND_TRACE_ANONYMIZE"])
+        return ProjectManagementApp(env=self.config["EVENTSOURCING_ENV"], metrics=self.metrics,
+                                    command_trace_recorder=command_trace_recorder)
+
+
+def config_from_env(environ=None) -> dict:
+    environ = os.environ if environ is None else environ
+    config = {}
+    if 'METRICS_ENABLED' in environ:
+        config["METRICS_ENABLED"] = strtobool(environ['METRICS_ENABLED'])
+    if environ.get('COMMAND_TRACE_PATH'):
+        config["COMMAND_TRACE_PATH"] = environ['COMMAND_TRACE_PATH']
+    if 'COMMAND_TRACE_ANONYMIZE' in environ:
+        config["COMMAND_TRACE_ANONYMIZE"] = strtobool(environ['COMMAND_TRACE_ANONYMIZE'])
+    if environ.get('WARM_UP_BOARDS'):
+        config["WARM_UP_BOARDS"] = int(environ['WARM_UP_BOARDS'])
+    for name in ('ADMISSION_MAX_CONCURRENT', 'ADMISSION_WRITE_RESERVED', 'ADMISSION_READS_PER_BOARD',
+                 'ADMISSION_MAX_QUEUED', 'ADMISSION_RETRY_AFTER', 'READ_COALESCE_MAX_BYTES'):
+        if environ.get(name):
+            config[name] = int(environ[name])
+    if environ.get('ADMISSION_QUEUE_TIMEOUT'):
+        config["ADMISSION_QUEUE_TIMEOUT"] = float(environ['ADMISSION_QUEUE_TIMEOUT'])
+    return config
+
+
+def create_app(config: dict = None) -> Flask:
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    app = Flask(__name__)
+    CORS(app, origins=config["CORS_ORIGINS"])
+    app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
+    lazy_app = LazyProjectManagementApp(config, Metrics(enabled=config["METRICS_ENABLED"]))
+    app.extensions['project_management'] = lazy_app
+    app.register_blueprint(blueprint)
+
+    if config["WARM_UP_BOARDS"]:
+        started = time.perf_counter()
+        warmed = warm_up_boards(lazy_app.get(), config["WARM_UP_BOARDS"])
+        logger.info("Warmed up %d boards in %.2fs", warmed, time.perf_counter() - started)
+    return app
+
+
+def _app() -> ProjectManagementApp:
+    return current_app.extensions['project_management'].get()
+
+
+def _metrics() -> Metrics:
+    return current_app.extensions['project_management'].metrics
+
+
+def idempotent(view):
+    # A command sent with a request_id runs once per id, retries get the first successful
+    # response. Error responses are not kept, so a corrected request may reuse the id.
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True) or {}
+        request_id = data.get('request_id')
+        if request_id is None:
+            return view(*args, **kwargs)
+
+        def run():
+            response = current_app.make_response(view(*args, **kwargs))
+            return response.get_data(), response.status_code, response.mimetype
+
+        deduplicator = current_app.extensions['project_management'].request_deduplicator
+        body, status, mimetype = deduplicator.run((request.path, str(request_id)), run,
+                                                  remember=lambda result: result[1] < 400)
+        return Response(body, status=status, mimetype=mimetype)
+
+    return wrapper
+
+
+def _admission() -> AdmissionController:
+    return current_app.extensions['project_management'].admission_controller
+
+
+def admitted_write(view):
+    # Writes get a slot ahead of expensive reads, or a 503 once the queue is full.
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with _admission().write():
+            return view(*args, **kwargs)
+
+    return wrapper
+
+
+def _admitted_stream(board_id, make_chunks, mimetype):
+    # The read slot is held until the response has been sent, or closed unsent.
+    with ExitStack() as stack:
+        stack.enter_context(_admission().read(board_id))
+        chunks = make_chunks()
+        slot = stack.pop_all()
+
+    def generate():
+        with slot:
+            yield from chunks
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.call_on_close(slot.close)
+    return response
+
+
+def _coalesced_board_json(board_id):
+    # Identical reads of one board version arriving together share a single render.
+    # Boards whose cached size estimate exceeds READ_COALESCE_MAX_BYTES are streamed to
+    # each reader instead of being held in memory whole.
+    lazy_app = current_app.extensions['project_management']
+    app = lazy_app.get()
+    version = app.get_board_version(board_id)
+    size = app.cached_board_size(board_id, version)
+    if size is not None and size > lazy_app.config["READ_COALESCE_MAX_BYTES"]:
+        return _admitted_stream(board_id, lambda: app.render_board(board_id, version), 'application/json')
+
+    def render():
+        with _admission().read(board_id):
+            return b"".join(app.render_board(board_id, version))
 
-app = Flask(__name__)
-CORS(app, origins=["http://localhost:5173", "http://127.0.0.1:5173"])
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
-app_instance = ProjectManagementApp()
+    body = lazy_app.read_coalescer.run((board_id, version), render)
+    return Response(body, mimetype='application/json')
 
 
-@app.errorhandler(Exception)
+def _optional_uuid(value):
+    return None if value is None else UUID(value)
+
+
+@blueprint.app_errorhandler(Exception)
 def handle_exception(e):
+    logger.exception("Unhandled error")
     response = jsonify(message=str(e))
-    print(e)
     response.status_code = 500
     return response
 
 
+@blueprint.app_errorhandler(RecordConflictError)
+def handle_record_conflict(e):
+    # Another request saved the same aggregate version first, the client may retry.
+    response = jsonify(message=f"Version conflict: {e}")
+    response.status_code = 409
+    return response
+
+
+@blueprint.app_errorhandler(AggregateNotFoundError)
+def handle_aggregate_not_found(e):
+    response = jsonify(message="Board not found")
+    response.status_code = 404
+    return response
+
+
+@blueprint.app_errorhandler(ItemNotFoundError)
+def handle_item_not_found(e):
+    # The client acted on a column or card another request already moved or removed,
+    # sending the command again would fail the same way.
+    response = jsonify(message=f"Board changed: {e}")
+    response.status_code = 422
+    return response
+
+
+@blueprint.app_errorhandler(OverloadedError)
+def handle_overloaded(e):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    _metrics().increment('http_requests_shed_total', route=route)
+    response = jsonify(message=str(e))
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+
+@blueprint.before_app_request
+def start_request_timer():
+    if _metrics().enabled:
+        g.request_started = time.perf_counter()
+
+
+@blueprint.after_app_request
+def observe_request_latency(response):
+    metrics = _metrics()
+    if metrics.enabled and 'request_started' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - g.request_started,
+                        method=request.method, route=route, status=response.status_code)
+    return response
+
+
+@blueprint.route('/metrics', methods=['GET'])
+def render_metrics():
+    metrics = _metrics()
+    if not metrics.enabled:
+        return jsonify({"message": "Metrics are disabled"}), 404
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@blueprint.route('/admin/memory', methods=['GET'])
+def memory_usage():
+    memory_governor = _app().memory_governor
+    limit = request.args.get('limit', default=10, type=int)
+    return jsonify({
+        "budget_bytes": memory_governor.budget_bytes,
+        "used_bytes": memory_governor.used_bytes,
+        "evictions": memory_governor.evictions,
+        "caches": memory_governor.usage_by_cache(),
+        "largest_boards": [{"board_id": str(board_id), "bytes": size}
+                           for board_id, size in memory_governor.largest_boards(limit)],
+    })
+
+
 # ---------------------- BOARD ----------------------
-@app.route('/create_board', methods=['POST'])
+@blueprint.route('/create_board', methods=['POST'])
+@admitted_write
+@idempotent
 def create_board():
-    board_id = app_instance.create_board()
+    board_id = _app().create_board()
     return jsonify({"board_id": board_id}), 201
 
 
-@app.route('/edit_board_title', methods=['PUT'])
+@blueprint.route('/edit_board_title', methods=['PUT'])
+@admitted_write
+@idempotent
 def edit_board_title():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
     title = data.get('title')
-    app_instance.edit_board_title(board_id, title)
+    _app().edit_board_title(board_id, title)
     return jsonify({"message": "Board title updated"})
 
 
-@app.route('/board_as_dict', methods=['GET'])
+@blueprint.route('/board_as_dict', methods=['GET'])
 def board_as_dict():
-    print("RENDER START")
     board_id = UUID(request.args.get('board_id'))
     try:
-        board = app_instance.board_as_dict(board_id)
-        print("RENDER END")
-        return jsonify(board)
-    except Exception as e:
-        print(e)
+        return _coalesced_board_json(board_id)
+    except OverloadedError:
+        raise
+    except Exception:
+        logger.exception("Could not render board %s", board_id)
         return jsonify({"message": "Board not found"})
 
 
+@blueprint.route('/import_board', methods=['POST'])
+@admitted_write
+@idempotent
+def import_board():
+    document = request.get_json()
+    try:
+        board_id = _app().import_board(document)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    return jsonify({"board_id": board_id}), 201
+
+
+@blueprint.route('/clone_board', methods=['POST'])
+@admitted_write
+@idempotent
+def clone_board():
+    data = request.get_json()
+    source_id = UUID(data.get('board_id'))
+    version = data.get('version')
+    board_id = _app().clone_board(source_id, None if version is None else int(version))
+    return jsonify({"board_id": board_id}), 201
+
+
+@blueprint.route('/export_board', methods=['GET'])
+def export_board():
+    board_id = UUID(request.args.get('board_id'))
+    if request.args.get('history') == 'true':
+        return _admitted_stream(board_id, lambda: _app().export_board_history(board_id), 'application/x-ndjson')
+    return _admitted_stream(board_id, lambda: _app().render_board(board_id), 'application/json')
+
+
+@blueprint.route('/board_history', methods=['GET'])
+def board_history():
+    board_id = UUID(request.args.get('board_id'))
+    from_version = request.args.get('from_version', type=int)
+    to_version = request.args.get('to_version', type=int)
+    try:
+        return _admitted_stream(board_id, lambda: _app().export_board_history(board_id, from_version, to_version),
+                                'application/x-ndjson')
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+
+@blueprint.route('/board_diff', methods=['GET'])
+def board_diff():
+    board_id = UUID(request.args.get('board_id'))
+    from_version = request.args.get('from_version', type=int)
+    to_version = request.args.get('to_version', type=int)
+    if from_version is None:
+        return jsonify({"message": "from_version is required"}), 400
+    try:
+        with _admission().read(board_id):
+            return jsonify(_app().diff_board(board_id, from_version, to_version))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+
 # ---------------------- COLUMN ----------------------
-@app.route('/add_column_to_board', methods=['POST'])
+@blueprint.route('/add_column_to_board', methods=['POST'])
+@admitted_write
+@idempotent
 def add_column_to_board():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
-    try:
-        print(app_instance)
-        print(app_instance.add_column)
-        column_id = str(app_instance.add_column(board_id))
-    except Exception as e:
-        print(e)
-    print(4)
+    column_id = str(_app().add_column(board_id, _optional_uuid(data.get('column_id'))))
     return jsonify({"column_id": column_id}), 201
 
 
-@app.route('/remove_column_from_board', methods=['DELETE'])
+@blueprint.route('/remove_column_from_board', methods=['DELETE'])
+@admitted_write
+@idempotent
 def remove_column_from_board():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
     column_id = UUID(data.get('column_id'))
-    app_instance.remove_column(board_id, column_id)
+    _app().remove_column(board_id, column_id)
     return jsonify({"message": "Column removed from board"})
 
 
-@app.route('/move_column_within_board', methods=['PUT'])
+@blueprint.route('/move_column_within_board', methods=['PUT'])
+@admitted_write
+@idempotent
 def move_column_within_board():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
     column_id = UUID(data.get('column_id'))
     new_index = int(data.get('new_index'))
-    app_instance.move_column(board_id, column_id, new_index)
+    _app().move_column(board_id, column_id, new_index)
     return jsonify({"message": "Column moved within board"})
 
 
-@app.route('/edit_column_title', methods=['PUT'])
+@blueprint.route('/edit_column_title', methods=['PUT'])
+@admitted_write
+@idempotent
 def edit_column_title():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
     column_id = UUID(data.get('column_id'))
     title = data.get('title')
-    app_instance.edit_column_title(board_id, column_id, title)
+    _app().edit_column_title(board_id, column_id, title)
     return jsonify({"message": "Column title updated"})
 
 
 # ---------------------- CARD ----------------------
-@app.route('/add_card_to_column', methods=['POST'])
+@blueprint.route('/add_card_to_column', methods=['POST'])
+@admitted_write
+@idempotent
 def add_card_to_column():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
     column_id = UUID(data.get('column_id'))
-    card_id = str(app_instance.add_card(board_id, column_id))
+    card_id = str(_app().add_card(board_id, column_id, _optional_uuid(data.get('card_id'))))
     return jsonify({"card_id": card_id}), 201
 
 
-@app.route('/remove_card_from_column', methods=['DELETE'])
+@blueprint.route('/remove_card_from_column', methods=['DELETE'])
+@admitted_write
+@idempotent
 def remove_card_from_column():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
     column_id = UUID(data.get('column_id'))
     card_id = UUID(data.get('card_id'))
-    app_instance.remove_card(board_id, column_id, card_id)
+    _app().remove_card(board_id, column_id, card_id)
     return jsonify({"message": "Card removed from column"})
 
 
-@app.route('/move_card', methods=['PUT'])
+@blueprint.route('/move_card', methods=['PUT'])
+@admitted_write
+@idempotent
 def move_card():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
@@ -120,52 +446,55 @@ def move_card():
     to_column_id = UUID(data.get('to_column_id'))
     card_id = UUID(data.get('card_id'))
     new_index = int(data.get('new_index'))
-    app_instance.move_card(board_id, from_column_id, to_column_id, card_id, new_index)
+    _app().move_card(board_id, from_column_id, to_column_id, card_id, new_index)
     return jsonify({"message": "Card moved"})
 
 
-@app.route('/edit_card_title', methods=['PUT'])
+@blueprint.route('/edit_card_title', methods=['PUT'])
+@admitted_write
+@idempotent
 def edit_card_title():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
     column_id = UUID(data.get('column_id'))
     card_id = UUID(data.get('card_id'))
     title = data.get('title')
-    app_instance.edit_card_title(board_id, column_id, card_id, title)
+    _app().edit_card_title(board_id, column_id, card_id, title)
     return jsonify({"message": "Card title updated"})
 
 
-@app.route('/edit_card_content', methods=['PUT'])
+@blueprint.route('/edit_card_content', methods=['PUT'])
+@admitted_write
+@idempotent
 def edit_card_content():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
     column_id = UUID(data.get('column_id'))
     card_id = UUID(data.get('card_id'))
     content = data.get('content')
-    app_instance.edit_card_content(board_id, column_id, card_id, content)
+    _app().edit_card_content(board_id, column_id, card_id, content)
     return jsonify({"message": "Card content updated"})
 
 
-@app.route('/undo', methods=['POST'])
+@blueprint.route('/undo', methods=['POST'])
+@admitted_write
+@idempotent
 def undo():
-    print("UNDO_START")
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
-    app_instance.undo(board_id)
-    print("UNDO_END")
+    _app().undo(board_id)
     return jsonify({"message": "Board undo"})
 
 
-@app.route('/redo', methods=['POST'])
+@blueprint.route('/redo', methods=['POST'])
+@admitted_write
+@idempotent
 def redo():
     data = request.get_json()
     board_id = UUID(data.get('board_id'))
-    print("1")
     try:
-        print("2")
-        app_instance.redo(board_id)
+        _app().redo(board_id)
         return jsonify({"message": "Board redo"})
     except Exception as e:
-        print("3")
-        print(e)
+        logger.exception("Could not redo board %s", board_id)
         return jsonify({"message": f"{e}"})
@@ -0,0 +1,3 @@
+from .command_trace import CommandTraceRecorder
+from .command_trace import traced_command
+from .trace_replayer import TraceReplayer
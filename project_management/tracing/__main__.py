@@ -0,0 +1,6 @@
+import sys
+
+from project_management.tracing.trace_replayer import main
+
+if __name__ == "__main__":
+    sys.exit(main())
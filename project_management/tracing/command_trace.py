@@ -0,0 +1,115 @@
+import functools
+import inspect
+import json
+import time
+from threading import Lock
+from uuid import UUID
+
+from project_management.import_export import columns_as_dicts
+
+BOARD_ID_ARGUMENTS = ("board_id", "source_id")
+BOARD_ID_RESULTS = ("create_board", "import_board", "clone_board")
+ANONYMIZED_FIELDS = ("title", "content")
+
+
+class CommandTraceRecorder:
+    """
+    Appends every traced command to an NDJSON file with its arguments, result and
+    timing. A board the trace has not seen yet is first written as an import of its
+    current state, so a replay against an empty store can rebuild it.
+    """
+
+    def __init__(self, trace_file, anonymize=False):
+        self.trace_file = trace_file
+        self.anonymize = anonymize
+        self._started = time.perf_counter()
+        self._seen_board_ids = set()
+        self._lock = Lock()
+
+    @classmethod
+    def open(cls, path, anonymize=False):
+        return cls(open(path, "a", encoding="utf-8", buffering=1), anonymize)
+
+    def close(self):
+        self.trace_file.close()
+
+    def before_command(self, app, arguments: dict):
+        for name in BOARD_ID_ARGUMENTS:
+            board_id = arguments.get(name)
+            if board_id is None:
+                continue
+            # Checked and written under the lock, so concurrent first commands import a board once.
+            with self._lock:
+                if board_id not in self._seen_board_ids:
+                    self._record_board_state(app, board_id)
+
+    def record(self, command, arguments: dict, result, started, duration, error=None):
+        entry = {
+            "t": started - self._started,
+            "duration": duration,
+            "command": command,
+            "args": self._anonymized(arguments),
+            "result": result if isinstance(result, UUID) else None,
+        }
+        if error is not None:
+            entry["error"] = repr(error)
+        with self._lock:
+            if command in BOARD_ID_RESULTS and result is not None:
+                self._seen_board_ids.add(result)
+            self._write_unlocked(entry)
+
+    def _record_board_state(self, app, board_id):
+        try:
+            version = app.undo_redo_state_manager.get_version_cursor(board_id)
+            board = app.repository.get(board_id, version=version)
+        except Exception:
+            return  # the traced command fails on its own
+        self._seen_board_ids.add(board_id)
+        document = {"title": board.title, "columns": columns_as_dicts(board.columns)}
+        self._write_unlocked({
+            "t": time.perf_counter() - self._started,
+            "duration": 0.0,
+            "command": "import_board",
+            "args": self._anonymized({"document": document}),
+            "result": board_id,
+        })
+
+    def _write_unlocked(self, entry):
+        self.trace_file.write(json.dumps(entry, default=str) + "\n")
+
+    def _anonymized(self, value):
+        if not self.anonymize:
+            return value
+        if isinstance(value, dict):
+            return {key: ("x" * len(item) if key in ANONYMIZED_FIELDS and isinstance(item, str)
+                          else self._anonymized(item))
+                    for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._anonymized(item) for item in value]
+        return value
+
+
+def traced_command(method):
+    # Costs one attribute check per call while no recorder is attached.
+    signature = inspect.signature(method)
+    command = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        recorder = self.command_trace_recorder
+        if recorder is None:
+            return method(self, *args, **kwargs)
+
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        arguments.pop("self")
+        recorder.before_command(self, arguments)
+        started = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception as e:
+            recorder.record(command, arguments, None, started, time.perf_counter() - started, error=e)
+            raise
+        recorder.record(command, arguments, result, started, time.perf_counter() - started)
+        return result
+
+    return wrapper
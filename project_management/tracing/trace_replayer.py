@@ -0,0 +1,128 @@
+"""
+Replays a command trace against a fresh store.
+
+    python -m project_management.tracing trace.ndjson                # as fast as possible
+    python -m project_management.tracing trace.ndjson --speed 1      # original pacing
+    python -m project_management.tracing trace.ndjson --profile replay.prof
+"""
+import argparse
+import cProfile
+import json
+import os
+import sys
+import tempfile
+import time
+from uuid import UUID
+
+
+class ReplayReport:
+
+    def __init__(self):
+        self.commands = {}
+        self.failures = 0
+        self.elapsed_seconds = 0.0
+
+    def add(self, command, seconds, recorded_seconds, failed):
+        stats = self.commands.setdefault(command, {"count": 0, "seconds": 0.0, "recorded_seconds": 0.0})
+        stats["count"] += 1
+        stats["seconds"] += seconds
+        stats["recorded_seconds"] += recorded_seconds
+        if failed:
+            self.failures += 1
+
+
+class TraceReplayer:
+    """
+    Runs traced commands in order. Ids returned while the trace was recorded are
+    mapped to the ids returned by the replay, so later commands find their targets.
+    With a speed of None commands run back to back, otherwise the recorded gaps are
+    kept, divided by the speed. on_command(command, args, seconds, error) is called
+    after every command.
+    """
+
+    def __init__(self, app, speed=None, on_command=None):
+        self.app = app
+        self.speed = speed
+        self.on_command = on_command
+        self.id_map = {}
+
+    def replay(self, lines) -> ReplayReport:
+        report = ReplayReport()
+        started = time.perf_counter()
+        for line in lines:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if self.speed is not None:
+                delay = entry["t"] / self.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+            args = self._resolve_args(entry["args"])
+            error = None
+            command_started = time.perf_counter()
+            try:
+                result = getattr(self.app, entry["command"])(**args)
+                if entry["command"] == "render_board":
+                    result = b"".join(result)
+            except Exception as e:
+                error = e
+                result = None
+            seconds = time.perf_counter() - command_started
+
+            if entry["result"] is not None and isinstance(result, UUID):
+                self.id_map[entry["result"]] = result
+            # Commands that failed while recording are expected to fail again.
+            report.add(entry["command"], seconds, entry["duration"], (error is None) == ("error" in entry))
+            if self.on_command is not None:
+                self.on_command(entry["command"], args, seconds, error)
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+    def _resolve_args(self, args):
+        resolved = {}
+        for name, value in args.items():
+            if name.endswith("_id") and value is not None:
+                value = self.id_map.get(value) or UUID(value)
+            resolved[name] = value
+        return resolved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a command trace against a fresh store.")
+    parser.add_argument("trace", help="NDJSON trace written by CommandTraceRecorder")
+    parser.add_argument("--speed", type=float, help="replay at this multiple of the recorded pace "
+                                                    "(default: as fast as possible)")
+    parser.add_argument("--db", help="SQLite file to replay into (default: a temporary file)")
+    parser.add_argument("--profile", help="write cProfile stats of the replay to this file")
+    args = parser.parse_args(argv)
+
+    # Imported here, the app module imports the recorder from this package.
+    from project_management.project_management_app import ProjectManagementApp
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        app = ProjectManagementApp(env={
+            "PERSISTENCE_MODULE": "eventsourcing.sqlite",
+            "SQLITE_DBNAME": args.db or os.path.join(temp_dir, "events.db"),
+        })
+        profiler = cProfile.Profile() if args.profile else None
+        try:
+            with open(args.trace, encoding="utf-8") as trace_file:
+                if profiler is not None:
+                    profiler.enable()
+                report = TraceReplayer(app, args.speed).replay(trace_file)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+            app.close()
+
+    print(f"replayed in {report.elapsed_seconds:.2f}s, {report.failures} unexpected results")
+    for command, stats in sorted(report.commands.items()):
+        print(f"  {command:<20} {stats['count']:6d}   replay {stats['seconds'] * 1000:9.1f} ms   "
+              f"recorded {stats['recorded_seconds'] * 1000:9.1f} ms")
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
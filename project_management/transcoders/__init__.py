@@ -1,2 +1,3 @@
 from .transcoders import CardTranscoding
 from .transcoders import ColumnTranscoding
+from .transcoders import UndoRedoStrategyTranscoding
@@ -1,8 +1,10 @@
 from typing import Any
 
+from bidict import bidict
 from eventsourcing.persistence import Transcoding
 
 from project_management.domain_model import Card, Column
+from project_management.undo_redo.undo_redo_state_manager import UndoRedoStrategy
 
 
 class CardTranscoding(Transcoding):
@@ -18,10 +20,7 @@ class CardTranscoding(Transcoding):
 
     def decode(self, data: Any) -> Any:
         # Create a Card from a dict.
-        card = Card(data["id"])
-        card.title = data.get("title", "")
-        card.content = data.get("content", "")
-        return card
+        return Card(data["id"], data.get("title", ""), data.get("content", ""))
 
 
 class ColumnTranscoding(Transcoding):
@@ -32,11 +31,28 @@ class ColumnTranscoding(Transcoding):
         return {
             "id": obj.id,
             "title": obj.title,
-            "cards": obj.cards
+            "cards": obj.cards,
+            "modified_version": obj.modified_version
         }
 
     def decode(self, data: Any) -> Any:
-        column = Column(data["id"])
-        column.title = data.get("title", "")
-        column.cards = data.get("cards", [])
-        return column
+        return Column(data["id"], data.get("title", ""), data.get("cards", ()), data.get("modified_version"))
+
+
+class UndoRedoStrategyTranscoding(Transcoding):
+    type = UndoRedoStrategy
+    name = "undo_redo_strategy_dict"
+
+    def encode(self, obj: Any) -> Any:
+        # JSON object keys are always strings, so the commit pairs are stored as a list.
+        return {
+            "min_version": obj._min_version,
+            "version_cursor": obj._version_cursor,
+            "undo_commits": sorted(obj._undo_commits.items())
+        }
+
+    def decode(self, data: Any) -> Any:
+        strategy = UndoRedoStrategy(data["min_version"])
+        strategy._version_cursor = data["version_cursor"]
+        strategy._undo_commits = bidict((k, v) for k, v in data["undo_commits"])
+        return strategy
@@ -1,4 +1,3 @@
-import sqlite3
 from uuid import UUID
 
 from bidict import bidict
@@ -6,11 +5,7 @@ from eventsourcing.application import Application
 from eventsourcing.domain import Aggregate, event
 
 from project_management.domain_model import Board
-
-import logging
-
-logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+from project_management.memory import TrackerCache
 
 
 class UndoRedoStrategy:
@@ -23,6 +18,12 @@ class UndoRedoStrategy:
     def get_version_cursor(self):
         return self._version_cursor
 
+    def get_min_version(self):
+        return self._min_version
+
+    def get_undo_commit_pairs(self):
+        return sorted({(min(k, v), max(k, v)) for k, v in self._undo_commits.items()})
+
     def increment_version_cursor(self):
         self._version_cursor += 1
 
@@ -45,7 +46,13 @@ class UndoRedoStrategy:
         self._undo_commits.forceput(reference_version, commit_version)
         self.clean_undo_commits()
         self._version_cursor = commit_version
-        logging.debug("undo_commits", self._undo_commits)
+
+    def advance_min_version(self, min_version):
+        # Commits whose reference lies below the new minimum can no longer be undone to.
+        self._min_version = max(self._min_version, min_version)
+        self._version_cursor = max(self._min_version, self._version_cursor)
+        self._undo_commits = bidict({k: v for k, v in self._undo_commits.items()
+                                     if min(k, v) >= self._min_version})
 
     def clean_undo_commits(self):
         pairs = {(min(k, v), max(k, v)) for k, v in self._undo_commits.items()}
@@ -71,31 +78,30 @@ class UndoRedoStrategy:
 class UndoRedoTracker(Aggregate):
 
     @event("TRACKER_CREATED")
-    def __init__(self, board_id):
-        logger.debug("TRACKER_CREATED")
+    def __init__(self, board_id, min_version=2):
         self.board_id = board_id
-        self.strategy = UndoRedoStrategy(min_version=2)
+        self.strategy = UndoRedoStrategy(min_version=min_version)
 
     @event("INCR_VERSION_CURSOR")
     def increment_version_cursor(self):
-        logger.debug("INCR_VERSION_CURSOR")
         self.strategy.increment_version_cursor()
 
     @event("UNDO")
     def undo(self):
-        logger.debug("UNDO")
         self.strategy.undo()
 
     @event("REDO")
     def redo(self, maximum_version):
-        logger.debug("REDO")
         self.strategy.redo(maximum_version)
 
     @event("COMMIT")
     def commit(self, commit_version, reference_version):
-        logger.debug("COMMIT")
         self.strategy.commit(commit_version, reference_version)
 
+    @event("UNDO_HORIZON_ADVANCED")
+    def advance_undo_horizon(self, min_version):
+        self.strategy.advance_min_version(min_version)
+
     def get_version_cursor(self):
         return self.strategy.get_version_cursor()
 
@@ -104,9 +110,10 @@ class UndoRedoStateManager:
     def __init__(self, app):
         self.app: Application = app
         self.board_id_to_undo_redo_tracker_id = {}
+        self.tracker_cache = TrackerCache(app.memory_governor)
 
-    def create_undo_redo_tracker(self, board_id):
-        undo_redo_tracker = UndoRedoTracker(board_id)
+    def create_undo_redo_tracker(self, board_id, min_version=2):
+        undo_redo_tracker = UndoRedoTracker(board_id, min_version)
         self.app.save(undo_redo_tracker)
         return undo_redo_tracker.id
 
@@ -120,9 +127,10 @@ class UndoRedoStateManager:
             undo_redo_tracker.commit(board.version, version_cursor)
             self.app.save(undo_redo_tracker)
 
-    def increment_version_cursor(self, board_id: UUID):
+    def increment_version_cursor(self, board_id: UUID, count: int = 1):
         undo_redo_tracker = self._get_undo_redo_tracker(board_id)
-        undo_redo_tracker.increment_version_cursor()
+        for _ in range(count):
+            undo_redo_tracker.increment_version_cursor()
         self.app.save(undo_redo_tracker)
 
     def undo(self, board_id: UUID):
@@ -141,11 +149,12 @@ class UndoRedoStateManager:
         return undo_redo_tracker.get_version_cursor()
 
     def _get_undo_redo_tracker(self, board_id) -> UndoRedoTracker:
-        if board_id not in self.board_id_to_undo_redo_tracker_id:
-            board = self.app.repository.get(board_id)
-            self.board_id_to_undo_redo_tracker_id[board_id] = board.undo_redo_tracker_id
-        undo_redo_tracker_uuid = self.board_id_to_undo_redo_tracker_id[board_id]
-        return self.app.repository.get(undo_redo_tracker_uuid)
+        with self.app.metrics.timer("undo_redo_tracker_load_seconds"):
+            if board_id not in self.board_id_to_undo_redo_tracker_id:
+                board = self.app.repository.get(board_id)
+                self.board_id_to_undo_redo_tracker_id[board_id] = board.undo_redo_tracker_id
+            undo_redo_tracker_uuid = self.board_id_to_undo_redo_tracker_id[board_id]
+            return self.tracker_cache.get(self.app, undo_redo_tracker_uuid)
 
     def _take_undo_commit_snapshot(self, board_id: UUID, version: int) -> None:
         reference_board = self.app.repository.get(board_id, version=version)
@@ -157,20 +166,6 @@ class UndoRedoStateManager:
         undo_commit_snapshot = snapshot_class.take(latest_board)
         self.app.snapshots.put([undo_commit_snapshot])
 
-    @staticmethod
-    def _get_latest_board_version(board_id: UUID):
-        board_uuid = board_id.hex
-        connection = sqlite3.connect("events.db")
-        try:
-            cursor = connection.cursor()
-            query = """
-                SELECT MAX(originator_version)
-                FROM stored_events
-                WHERE originator_id = ?
-            """
-            cursor.execute(query, (board_uuid,))
-            row = cursor.fetchone()
-        finally:
-            connection.close()
-
-        return row[0] if row[0] is not None else 0
+    def _get_latest_board_version(self, board_id: UUID):
+        latest_events = list(self.app.events.get(board_id, desc=True, limit=1))
+        return latest_events[0].originator_version if latest_events else 0
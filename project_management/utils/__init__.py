@@ -1,4 +1,6 @@
-from .collection_utils import edit_item_by_id
+from .collection_utils import ItemNotFoundError
 from .collection_utils import find_item_by_id
-from .collection_utils import remove_item_by_id
+from .collection_utils import with_item_appended
 from .collection_utils import with_item_moved_by_id
+from .collection_utils import with_item_replaced_by_id
+from .collection_utils import without_item_by_id
@@ -1,24 +1,40 @@
+# Collections are treated as persistent sequences: every change returns a new tuple
+# that shares the unchanged items with the collection it was derived from.
+
+class ItemNotFoundError(ValueError):
+    pass
+
+
 def find_item_by_id(collection, item_id):
     return next((item for item in collection if item.id == item_id), None)
 
 
-def edit_item_by_id(collection, item_id, f):
-    f(find_item_by_id(collection, item_id))
+def _index_of_item_by_id(collection, item_id):
+    item_index = next((i for i, item in enumerate(collection) if item.id == item_id), None)
+    if item_index is None:
+        raise ItemNotFoundError(f"Item with ID {item_id} not found in collection {collection}")
+    return item_index
 
 
-def remove_item_by_id(collection, item_id):
-    item_to_remove = find_item_by_id(collection, item_id)
-    if item_to_remove is None:
-        raise ValueError(f"Item with ID {item_id} not found in collection {collection}")
-    collection.remove(item_to_remove)
+def with_item_appended(collection, item):
+    return (*collection, item)
 
 
-def with_item_moved_by_id(collection, item_id, new_index):
-    item_index = next((i for i, item in enumerate(collection) if item.id == item_id), None)
-    if item_index is None:
-        raise ValueError(f"Item {item_id} not found in {collection}")
+def with_item_replaced_by_id(collection, item_id, f):
+    item_index = _index_of_item_by_id(collection, item_id)
+    return (*collection[:item_index], f(collection[item_index]), *collection[item_index + 1:])
+
 
-    item = collection[item_index]
-    collection[item_index] = None
-    collection.insert(new_index, item)
-    return list(filter(None, collection))
+def without_item_by_id(collection, item_id):
+    item_index = _index_of_item_by_id(collection, item_id)
+    return (*collection[:item_index], *collection[item_index + 1:])
+
+
+def with_item_moved_by_id(collection, item_id, new_index):
+    # new_index counts the item's old slot, which is dropped after the insert.
+    item_index = _index_of_item_by_id(collection, item_id)
+    items = list(collection)
+    item = items[item_index]
+    items[item_index] = None
+    items.insert(new_index, item)
+    return tuple(item for item in items if item is not None)
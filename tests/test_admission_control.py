@@ -0,0 +1,169 @@
+import threading
+import time
+import unittest
+from uuid import UUID
+
+from project_management.concurrency import AdmissionController, OverloadedError, SingleFlight
+from project_management.rest_api import create_app
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+class TestAdmissionController(unittest.TestCase):
+
+    def test_waiting_writes_go_before_waiting_reads(self):
+        controller = AdmissionController(max_concurrent=1, reserved_for_writes=0, queue_timeout=2.0)
+        order = []
+
+        def read():
+            with controller.read("board"):
+                order.append("read")
+
+        def write():
+            with controller.write():
+                order.append("write")
+
+        with controller.write():
+            reader = threading.Thread(target=read)
+            reader.start()
+            _wait_until(lambda: controller._waiting_reads == 1)
+            writer = threading.Thread(target=write)
+            writer.start()
+            _wait_until(lambda: controller._waiting_writes == 1)
+        reader.join()
+        writer.join()
+        self.assertEqual(order, ["write", "read"])
+
+    def test_reads_are_limited_per_board_and_leave_room_for_writes(self):
+        controller = AdmissionController(max_concurrent=3, reserved_for_writes=1, max_reads_per_board=1,
+                                         queue_timeout=0.01)
+        with controller.read("a"):
+            with self.assertRaises(OverloadedError):
+                with controller.read("a"):
+                    pass
+            with controller.read("b"):
+                with self.assertRaises(OverloadedError):
+                    with controller.read("c"):
+                        pass
+                with controller.write():
+                    pass
+        self.assertEqual(controller.shed, 2)
+
+    def test_full_queue_sheds_without_waiting(self):
+        controller = AdmissionController(max_concurrent=1, max_queued=0, queue_timeout=10, retry_after=3)
+        started = time.monotonic()
+        with controller.write():
+            with self.assertRaises(OverloadedError) as context:
+                with controller.write():
+                    pass
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(context.exception.retry_after, 3)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_result(self):
+        single_flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def render():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "board"
+
+        threads = [threading.Thread(target=lambda: results.append(single_flight.run("key", render)))
+                   for _ in range(4)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        _wait_until(lambda: single_flight.coalesced == 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((calls, results), ([1], ["board"] * 4))
+
+        def fail():
+            raise RuntimeError("failed")
+
+        with self.assertRaises(RuntimeError):
+            single_flight.run("key", fail)
+        self.assertEqual(single_flight.run("key", lambda: "again"), "again")
+
+
+class TestLoadShedding(unittest.TestCase):
+
+    def test_overloaded_requests_get_503_with_retry_after(self):
+        flask_app = create_app({"EVENTSOURCING_ENV": {"PERSISTENCE_MODULE": "eventsourcing.popo"},
+                                "ADMISSION_RETRY_AFTER": 2})
+        client = flask_app.test_client()
+        board_id = client.post('/create_board').get_json()["board_id"]
+        controller = flask_app.extensions['project_management'].admission_controller
+        controller.max_queued = 0
+
+        slots = [controller.write() for _ in range(controller.max_concurrent)]
+        for slot in slots:
+            slot.__enter__()
+        try:
+            for response in (client.get(f'/board_as_dict?board_id={board_id}'),
+                             client.put('/edit_board_title', json={"board_id": board_id, "title": "Shed",
+                                                                   "request_id": "edit"})):
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(response.headers["Retry-After"], "2")
+        finally:
+            for slot in slots:
+                slot.__exit__(None, None, None)
+
+        response = client.put('/edit_board_title', json={"board_id": board_id, "title": "Kept", "request_id": "edit"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get(f'/board_as_dict?board_id={board_id}').get_json()["board"]["title"], "Kept")
+
+    def test_read_renders_the_version_it_was_coalesced_under(self):
+        flask_app = create_app({"EVENTSOURCING_ENV": {"PERSISTENCE_MODULE": "eventsourcing.popo"}})
+        client = flask_app.test_client()
+        board_id = client.post('/create_board').get_json()["board_id"]
+        version = client.get(f'/board_as_dict?board_id={board_id}').get_json()["board"]["version"]
+        controller = flask_app.extensions['project_management'].admission_controller
+
+        responses = []
+        with controller.read(UUID(board_id)), controller.read(UUID(board_id)):
+            reader = threading.Thread(target=lambda: responses.append(
+                flask_app.test_client().get(f'/board_as_dict?board_id={board_id}').get_json()))
+            reader.start()
+            _wait_until(lambda: controller._waiting_reads == 1)
+            client.put('/edit_board_title', json={"board_id": board_id, "title": "Newer"})
+        reader.join()
+
+        self.assertEqual(responses[0]["board"]["version"], version)
+        self.assertEqual(client.get(f'/board_as_dict?board_id={board_id}').get_json()["board"]["title"], "Newer")
+
+    def test_large_boards_and_exports_are_streamed_within_a_slot(self):
+        flask_app = create_app({"EVENTSOURCING_ENV": {"PERSISTENCE_MODULE": "eventsourcing.popo"},
+                                "READ_COALESCE_MAX_BYTES": 10})
+        client = flask_app.test_client()
+        board_id = client.post('/create_board').get_json()["board_id"]
+        client.post('/add_column_to_board', json={"board_id": board_id})
+        controller = flask_app.extensions['project_management'].admission_controller
+        client.get(f'/board_as_dict?board_id={board_id}')  # rendered whole, caching the board with its estimate
+        self.assertEqual(controller._active, 0)
+
+        for url in (f'/board_as_dict?board_id={board_id}', f'/export_board?board_id={board_id}',
+                    f'/export_board?board_id={board_id}&history=true'):
+            response = client.get(url)
+            self.assertTrue(response.is_streamed)
+            self.assertEqual(controller._active, 1)
+            self.assertTrue(response.get_data())
+            self.assertEqual(controller._active, 0)
+        self.assertEqual(len(client.get(f'/board_as_dict?board_id={board_id}').get_json()["board"]["columns"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+
+from benchmarks import app_benchmark
+
+
+class TestAppBenchmark(unittest.TestCase):
+
+    def test_run_benchmarks_covers_every_operation(self):
+        with mock.patch.dict(app_benchmark.SCENARIOS, {"tiny": (2, 2, 2)}, clear=True):
+            results = app_benchmark.run_benchmarks(["tiny"], seed=1, repeat=2)
+        operations = results["scenarios"]["tiny"]["operations"]
+        self.assertIn("move_card_across_columns", operations)
+        self.assertIn("board_as_dict", operations)
+        self.assertIn("import_board", operations)
+        self.assertIn("clone_board", operations)
+        self.assertTrue(all(timing["median_ms"] >= 0 for timing in operations.values()))
+
+    def test_find_regressions(self):
+        baseline = {"scenarios": {"small": {"operations": {
+            "undo": {"median_ms": 2.0}, "redo": {"median_ms": 2.0}, "create_board": {"median_ms": 0.1},
+        }}}}
+        results = {"scenarios": {"small": {"operations": {
+            "undo": {"median_ms": 2.5}, "redo": {"median_ms": 3.5}, "create_board": {"median_ms": 0.4},
+            "board_as_dict": {"median_ms": 9.0},
+        }}}}
+        self.assertEqual(app_benchmark.find_regressions(results, baseline, tolerance=1.5),
+                         [("small", "redo", 2.0, 3.5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
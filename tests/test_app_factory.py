@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from project_management.maintenance import recently_active_board_ids
+from project_management.project_management_app import ProjectManagementApp
+from project_management.rest_api import config_from_env, create_app
+
+
+class TestAppFactory(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = {
+            "PERSISTENCE_MODULE": "eventsourcing.sqlite",
+            "SQLITE_DBNAME": os.path.join(self.temp_dir.name, "events.db"),
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _populate(self):
+        app = ProjectManagementApp(env=self.env)
+        board_ids = [app.create_board() for _ in range(3)]
+        for _ in range(5):
+            app.edit_board_title(board_ids[1], "Busy")
+        app.undo(board_ids[0])
+        app.close()
+        return board_ids
+
+    def test_app_is_constructed_on_first_request(self):
+        flask_app = create_app({"EVENTSOURCING_ENV": self.env})
+        lazy_app = flask_app.extensions['project_management']
+        self.assertIsNone(lazy_app._app_instance)
+
+        response = flask_app.test_client().post('/create_board')
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNotNone(lazy_app._app_instance)
+        self.assertEqual(flask_app.test_client().get('/metrics').status_code, 404)
+
+    def test_config_from_env(self):
+        self.assertEqual(config_from_env({"METRICS_ENABLED": "y", "WARM_UP_BOARDS": "20"}),
+                         {"METRICS_ENABLED": True, "WARM_UP_BOARDS": 20})
+
+    def test_recently_active_boards_include_undo(self):
+        board_ids = self._populate()
+        app = ProjectManagementApp(env=self.env)
+        self.assertEqual(recently_active_board_ids(app, 2), [board_ids[0], board_ids[1]])
+        self.assertEqual(recently_active_board_ids(app, 10), [board_ids[0], board_ids[1], board_ids[2]])
+        app.close()
+
+    def test_warm_up_snapshots_and_renders_recent_boards(self):
+        board_ids = self._populate()
+        flask_app = create_app({"EVENTSOURCING_ENV": self.env, "WARM_UP_BOARDS": 2})
+        app = flask_app.extensions['project_management']._app_instance
+        self.assertIsNotNone(app)
+
+        busy_board = app.repository.get(board_ids[1])
+        snapshots = list(app.snapshots.get(board_ids[1], desc=True, limit=1))
+        self.assertEqual(snapshots[0].originator_version, busy_board.version)
+        self.assertEqual(list(app.snapshots.get(board_ids[2])), [])
+        self.assertIn(board_ids[0], app.undo_redo_state_manager.board_id_to_undo_redo_tracker_id)
+
+        response = flask_app.test_client().get(f'/board_as_dict?board_id={board_ids[1]}')
+        self.assertEqual(response.get_json()["board"]["title"], "Busy")
+        app.close()
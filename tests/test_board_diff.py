@@ -0,0 +1,72 @@
+import json
+import unittest
+
+from project_management.project_management_app import ProjectManagementApp
+
+
+class TestBoardDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.popo"})
+        self.board_id = self.app.import_board({"title": "Board", "columns": [
+            {"title": "To Do", "cards": [{"title": f"Card {i}"} for i in range(5)]},
+            {"title": "Done", "cards": [{"title": "Old"}]},
+            {"title": "Untouched", "cards": [{"title": "Same"}]},
+        ]})
+        board = self.app.repository.get(self.board_id)
+        self.todo, self.done, _ = board.columns
+        self.base_version = board.version
+
+    def cursor(self):
+        return self.app.undo_redo_state_manager.get_version_cursor(self.board_id)
+
+    def test_structural_changes(self):
+        cards = self.todo.cards
+        self.app.edit_board_title(self.board_id, "Renamed")
+        self.app.edit_column_title(self.board_id, self.done.id, "Shipped")
+        self.app.edit_card_title(self.board_id, self.todo.id, cards[1].id, "Edited")
+        self.app.move_card(self.board_id, self.todo.id, self.todo.id, cards[4].id, 0)
+        self.app.move_card(self.board_id, self.todo.id, self.done.id, cards[2].id, 0)
+        self.app.remove_card(self.board_id, self.done.id, self.done.cards[0].id)
+        column_id = self.app.add_column(self.board_id)
+        card_id = self.app.add_card(self.board_id, column_id)
+
+        diff = self.app.diff_board(self.board_id, self.base_version)
+        self.assertEqual(diff["to_version"], self.cursor())
+        self.assertEqual(diff["title"], {"from": "Board", "to": "Renamed"})
+        self.assertEqual([c["id"] for c in diff["columns"]["added"]], [str(column_id)])
+        self.assertEqual(diff["columns"]["renamed"], [{"id": str(self.done.id), "from": "Done", "to": "Shipped"}])
+        self.assertEqual(diff["columns"]["removed"], [])
+        self.assertEqual(diff["columns"]["moved"], [])
+        self.assertEqual([c["id"] for c in diff["cards"]["added"]], [str(card_id)])
+        self.assertEqual([c["title"] for c in diff["cards"]["removed"]], ["Old"])
+        self.assertEqual(diff["cards"]["edited"], [{"id": str(cards[1].id), "column_id": str(self.todo.id),
+                                                    "title": {"from": "Card 1", "to": "Edited"}}])
+        self.assertEqual(sorted((m["id"], m["to_index"]) for m in diff["cards"]["moved"]),
+                         sorted([(str(cards[4].id), 0), (str(cards[2].id), 0)]))
+
+    def test_diff_replays_from_undo_commit_snapshot(self):
+        self.app.edit_board_title(self.board_id, "First")
+        self.app.edit_board_title(self.board_id, "Second")
+        self.app.undo(self.board_id)
+        self.app.undo(self.board_id)
+        self.app.edit_column_title(self.board_id, self.todo.id, "Doing")
+
+        diff = self.app.diff_board(self.board_id, self.base_version + 1)
+        self.assertEqual(diff["title"], {"from": "First", "to": "Board"})
+        self.assertEqual(diff["columns"]["renamed"], [{"id": str(self.todo.id), "from": "To Do", "to": "Doing"}])
+        self.assertEqual(diff["cards"], {"added": [], "removed": [], "moved": [], "edited": []})
+
+        self.assertEqual(self.app.diff_board(self.board_id, self.cursor())["columns"]["renamed"], [])
+        with self.assertRaises(ValueError):
+            self.app.diff_board(self.board_id, self.cursor() + 1, self.cursor())
+
+    def test_history_over_version_range(self):
+        self.app.edit_board_title(self.board_id, "First")
+        self.app.edit_board_title(self.board_id, "Second")
+        lines = [json.loads(line) for line in self.app.export_board_history(
+            self.board_id, from_version=self.base_version + 1, to_version=self.base_version + 1)]
+        self.assertEqual([(line["version"], line["event"]) for line in lines],
+                         [(self.base_version + 1, "BOARD_TITLE_EDITED")])
+        self.assertEqual(lines[0]["data"], {"title": "First"})
+        self.assertIn("timestamp", lines[0])
@@ -0,0 +1,93 @@
+import json
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from project_management.project_management_app import ProjectManagementApp
+from project_management.rest_api import create_app
+
+
+class TestBoardImportExport(unittest.TestCase):
+
+    def setUp(self):
+        self.app = ProjectManagementApp()
+        self.document = {
+            "board": {
+                "title": "Imported",
+                "columns": [
+                    {"title": "To Do", "cards": [{"title": f"Card {i}", "content": "..."} for i in range(7)]},
+                    {"id": str(uuid4()), "title": "Done", "cards": [{"id": str(uuid4()), "title": "Shipped"}]},
+                ],
+            }
+        }
+
+    def test_import_board_in_chunks(self):
+        board_id = self.app.import_board(self.document, chunk_size=3)
+        board = self.app.repository.get(board_id)
+        # created, imported, two card chunks for "To Do" and one for "Done", tracker linked
+        self.assertEqual(board.version, 6)
+
+        board_dict = self.app.board_as_dict(board_id)["board"]
+        self.assertEqual(board_dict["title"], "Imported")
+        self.assertEqual([c["title"] for c in board_dict["columns"][0]["cards"]], [f"Card {i}" for i in range(7)])
+        self.assertEqual(board_dict["columns"][1]["id"], self.document["board"]["columns"][1]["id"])
+        self.assertEqual(board_dict["columns"][1]["cards"][0]["content"], "")
+
+    def test_undo_stops_at_imported_state(self):
+        board_id = self.app.import_board(self.document)
+        self.app.edit_board_title(board_id, "Edited")
+        self.app.undo(board_id)
+        self.app.undo(board_id)
+        self.assertEqual(self.app.board_as_dict(board_id)["board"]["title"], "Imported")
+
+    def test_export_round_trips_through_import(self):
+        board_id = self.app.import_board(self.document)
+        exported = json.loads(b"".join(self.app.render_board(board_id)))
+        self.assertEqual(exported, self.app.board_as_dict(board_id))
+
+        copy_id = self.app.import_board(exported)
+        copy = self.app.board_as_dict(copy_id)["board"]
+        self.assertEqual(copy["columns"], exported["board"]["columns"])
+
+    def test_export_history_as_ndjson(self):
+        board_id = self.app.create_board()
+        self.app.edit_board_title(board_id, "Title")
+        lines = [json.loads(line) for line in self.app.export_board_history(board_id)]
+        self.assertEqual([line["event"] for line in lines],
+                         ["BOARD_CREATED", "UNDO_REDO_TRACKER_LINKED", "BOARD_TITLE_EDITED"])
+        self.assertEqual(lines[2]["data"], {"title": "Title"})
+
+    def test_export_history_does_not_rebuild_the_board(self):
+        board_id = self.app.create_board()
+        with mock.patch.object(self.app.repository, "get", side_effect=AssertionError("board rebuilt")):
+            lines = list(self.app.export_board_history(board_id))
+        self.assertEqual(len(lines), 2)
+
+    def test_import_rejects_duplicate_ids(self):
+        card_id = str(uuid4())
+        document = {"columns": [{"cards": [{"id": card_id}, {"id": card_id}]}]}
+        with self.assertRaises(ValueError):
+            self.app.import_board(document)
+
+    def test_import_rejects_entries_that_are_not_objects(self):
+        for document in ({"columns": ["To Do"]}, {"columns": [{"cards": [["card"]]}]}, {"columns": "To Do"}):
+            with self.assertRaises(ValueError):
+                self.app.import_board(document)
+
+
+class TestBoardImportExportRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.client = create_app({"EVENTSOURCING_ENV": {"PERSISTENCE_MODULE": "eventsourcing.popo"}}).test_client()
+
+    def test_malformed_import_is_rejected(self):
+        response = self.client.post('/import_board', json={"columns": [{"cards": ["card"]}]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_history_of_unknown_board_is_not_found(self):
+        response = self.client.get(f'/export_board?board_id={uuid4()}&history=true')
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from project_management.maintenance import list_board_ids, rebuild_board, rebuild_boards, verify_board
+from project_management.project_management_app import ProjectManagementApp
+
+
+class TestBoardRebuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.env = {
+            "PERSISTENCE_MODULE": "eventsourcing.sqlite",
+            "SQLITE_DBNAME": os.path.join(self.temp_dir.name, "events.db"),
+        }
+        self.app = ProjectManagementApp(env=self.env)
+
+    def tearDown(self):
+        self.app.close()
+        self.temp_dir.cleanup()
+
+    def _create_board_with_history(self):
+        board_id = self.app.create_board()
+        column_id = self.app.add_column(board_id)
+        card_id = self.app.add_card(board_id, column_id)
+        self.app.edit_card_title(board_id, column_id, card_id, "Card")
+        self.app.undo(board_id)
+        self.app.edit_board_title(board_id, "Board")
+        return board_id
+
+    def test_list_board_ids(self):
+        board_ids = [self.app.create_board() for _ in range(3)]
+        self.assertEqual(list_board_ids(self.app, page_size=2), board_ids)
+
+    def test_verify_healthy_board(self):
+        board_id = self._create_board_with_history()
+        self.assertEqual(verify_board(self.app, board_id), [])
+
+    def test_rebuild_board_writes_snapshots_once(self):
+        board_id = self._create_board_with_history()
+        tracker_id = self.app.repository.get(board_id).undo_redo_tracker_id
+        strategy_before = self.app.repository.get(tracker_id).strategy
+
+        result = rebuild_board(self.app, board_id, write_snapshots=True)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.snapshots_written, 2)
+
+        strategy_after = self.app.repository.get(tracker_id).strategy
+        self.assertEqual(strategy_after.get_undo_commit_pairs(), strategy_before.get_undo_commit_pairs())
+        self.assertEqual(strategy_after.get_version_cursor(), strategy_before.get_version_cursor())
+
+        result = rebuild_board(self.app, board_id, write_snapshots=True)
+        self.assertEqual(result.snapshots_written, 0)
+
+    def test_snapshot_write_failure_is_reported_for_the_board(self):
+        board_id = self._create_board_with_history()
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        with mock.patch.object(self.app, "take_snapshot", fail):
+            result = rebuild_board(self.app, board_id, write_snapshots=True)
+        self.assertFalse(result.ok)
+        self.assertEqual(len(result.problems), 2)
+        self.assertIn("disk full", result.problems[0])
+
+    def test_rebuild_boards_in_process_pool(self):
+        board_ids = [self._create_board_with_history() for _ in range(4)]
+        report = rebuild_boards(self.env, board_ids, workers=2, chunk_size=1)
+        self.assertEqual(report.boards_checked, 4)
+        self.assertEqual(report.failures, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import unittest
+
+from project_management.project_management_app import ProjectManagementApp
+
+
+class TestBoardRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.app = ProjectManagementApp()
+        self.renderer = self.app.board_renderer
+
+    def _render(self, board_id):
+        return json.loads(b"".join(self.app.render_board(board_id)))
+
+    def test_render_matches_board_as_dict(self):
+        board_id = self.app.create_board()
+        self.app.edit_board_title(board_id, 'Board "quoted" ✓')
+        column_id = self.app.add_column(board_id)
+        card_id = self.app.add_card(board_id, column_id)
+        self.app.edit_card_content(board_id, column_id, card_id, "line\nbreak")
+        self.app.add_column(board_id)
+        self.assertEqual(self._render(board_id), self.app.board_as_dict(board_id))
+
+    def test_unchanged_columns_are_served_from_cache(self):
+        board_id = self.app.create_board()
+        column_1 = self.app.add_column(board_id)
+        column_2 = self.app.add_column(board_id)
+        self.app.add_card(board_id, column_1)
+        self._render(board_id)
+        misses = self.renderer.misses
+
+        card_id = self.app.add_card(board_id, column_2)
+        self.app.edit_card_title(board_id, column_2, card_id, "Changed")
+        rendered = self._render(board_id)
+
+        self.assertEqual(self.renderer.misses, misses + 1)
+        self.assertEqual(rendered["board"]["columns"][1]["cards"][0]["title"], "Changed")
+
+    def test_undo_renders_cached_reference_columns(self):
+        board_id = self.app.create_board()
+        column_id = self.app.add_column(board_id)
+        self.app.edit_column_title(board_id, column_id, "Before")
+        self._render(board_id)
+        self.app.edit_column_title(board_id, column_id, "After")
+        self.app.undo(board_id)
+        self.assertEqual(self._render(board_id)["board"]["columns"][0]["title"], "Before")
+
+        self.app.edit_board_title(board_id, "Commit")  # snapshots the undone state
+        self.assertEqual(self._render(board_id)["board"]["columns"][0]["title"], "Before")
+
+
+if __name__ == "__main__":
+    unittest.main()
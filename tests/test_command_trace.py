@@ -0,0 +1,100 @@
+import io
+import json
+import threading
+import unittest
+
+from project_management.project_management_app import ProjectManagementApp
+from project_management.tracing import CommandTraceRecorder, TraceReplayer
+
+
+class TestCommandTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.trace_file = io.StringIO()
+        self.app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.popo"})
+
+    def record(self, anonymize=False):
+        self.app.command_trace_recorder = CommandTraceRecorder(self.trace_file, anonymize)
+
+    def entries(self):
+        return [json.loads(line) for line in self.trace_file.getvalue().splitlines()]
+
+    def replay(self, **kwargs):
+        replay_app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.popo"})
+        replayer = TraceReplayer(replay_app, **kwargs)
+        report = replayer.replay(io.StringIO(self.trace_file.getvalue()))
+        return replay_app, replayer, report
+
+    def test_replay_maps_returned_ids(self):
+        self.record()
+        board_id = self.app.create_board()
+        self.app.edit_board_title(board_id, "Sprint")
+        column_id = self.app.add_column(board_id)
+        other_column_id = self.app.add_column(board_id)
+        card_id = self.app.add_card(board_id, column_id)
+        self.app.edit_card_title(board_id, column_id, card_id, "Secret plan")
+        self.app.move_card(board_id, column_id, other_column_id, card_id, 0)
+        self.app.undo(board_id)
+        with self.assertRaises(ValueError):
+            self.app.remove_card(board_id, other_column_id, column_id)
+        self.app.board_as_dict(board_id)
+
+        self.assertEqual([entry["command"] for entry in self.entries()], [
+            "create_board", "edit_board_title", "add_column", "add_column", "add_card", "edit_card_title",
+            "move_card", "undo", "remove_card", "board_as_dict"])
+        self.assertIn("error", self.entries()[-2])
+
+        replay_app, replayer, report = self.replay()
+        self.assertEqual(report.failures, 0)
+        self.assertEqual(report.commands["add_column"]["count"], 2)
+        replayed = replay_app.board_as_dict(replayer.id_map[str(board_id)])["board"]
+        original = self.app.board_as_dict(board_id)["board"]
+        self.assertEqual(replayed["version"], original["version"])
+        self.assertEqual(json.dumps(replayed["columns"], sort_keys=True).count("Secret plan"), 1)
+        self.assertEqual([len(c["cards"]) for c in replayed["columns"]],
+                         [len(c["cards"]) for c in original["columns"]])
+
+    def test_anonymized_trace_starts_with_existing_board_state(self):
+        board_id = self.app.import_board({"title": "Customer", "columns": [
+            {"title": "To Do", "cards": [{"title": "Confidential", "content": "Do not share"}]}]})
+        column_id = self.app.repository.get(board_id).columns[0].id
+
+        self.record(anonymize=True)
+        self.app.edit_column_title(board_id, column_id, "Doing")
+        self.app.add_card(board_id, column_id)
+
+        trace = self.trace_file.getvalue()
+        for text in ("Customer", "Confidential", "Do not share", "Doing"):
+            self.assertNotIn(text, trace)
+        self.assertEqual([entry["command"] for entry in self.entries()], ["import_board", "edit_column_title",
+                                                                          "add_card"])
+
+        replay_app, replayer, report = self.replay()
+        self.assertEqual(report.failures, 0)
+        replayed = replay_app.board_as_dict(replayer.id_map[str(board_id)])["board"]
+        self.assertEqual(replayed["title"], "xxxxxxxx")
+        self.assertEqual(replayed["columns"][0]["title"], "xxxxx")
+        self.assertEqual(len(replayed["columns"][0]["cards"]), 2)
+
+    def test_concurrent_first_reads_import_the_board_once(self):
+        board_id = self.app.create_board()
+        self.record()
+        threads = [threading.Thread(target=self.app.board_as_dict, args=(board_id,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([entry["command"] for entry in self.entries()].count("import_board"), 1)
+
+    def test_replay_pacing_and_hooks(self):
+        self.record()
+        board_id = self.app.create_board()
+        self.app.render_board(board_id)
+        lines = self.trace_file.getvalue().splitlines()
+        entries = [dict(json.loads(line), t=i * 0.05) for i, line in enumerate(lines)]
+        self.trace_file = io.StringIO("\n".join(json.dumps(entry) for entry in entries))
+
+        calls = []
+        _, _, report = self.replay(speed=1.0, on_command=lambda command, *_: calls.append(command))
+        self.assertEqual(calls, ["create_board", "render_board"])
+        self.assertGreaterEqual(report.elapsed_seconds, 0.05)
@@ -0,0 +1,69 @@
+import copy
+import pickle
+import unittest
+from uuid import uuid4
+
+from project_management.domain_model import Board, Card, Column
+from project_management.project_management_app import ProjectManagementApp
+
+
+class TestDomainModel(unittest.TestCase):
+
+    def test_card_and_column_are_immutable(self):
+        card = Card(uuid4(), "Title")
+        with self.assertRaises(AttributeError):
+            card.title = "Changed"
+        self.assertEqual(card.replace(title="Changed").title, "Changed")
+        self.assertEqual(card.title, "Title")
+
+        column = Column(uuid4(), cards=[card])
+        self.assertEqual(column.cards, (card,))
+        with self.assertRaises(AttributeError):
+            column.cards = ()
+
+    def test_copies_share_values(self):
+        column = Column(uuid4(), "To Do", [Card(uuid4())])
+        self.assertIs(copy.deepcopy(column), column)
+        unpickled = pickle.loads(pickle.dumps(column))
+        self.assertEqual((unpickled.id, unpickled.title, unpickled.cards[0].id),
+                         (column.id, column.title, column.cards[0].id))
+
+    def test_replace_keeps_unchanged_values(self):
+        column = Column(uuid4(), "To Do", [Card(uuid4())], modified_version=3)
+        replaced = column.replace(title="Done")
+        self.assertEqual((replaced.id, replaced.title, replaced.cards, replaced.modified_version),
+                         (column.id, "Done", column.cards, 3))
+
+    def test_columns_stay_a_tuple_when_loaded_from_a_snapshot(self):
+        app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.popo"})
+        board_id = app.import_board({"columns": [{"title": "To Do", "cards": [{"title": "Card"}]}]})
+        app.add_column(board_id)
+        app.take_snapshot(board_id)
+        app.add_column(board_id)
+
+        for version in (app.repository.get(board_id).version - 1, None):
+            board = app.repository.get(board_id, version=version)
+            self.assertIsInstance(board.columns, tuple)
+            self.assertIsInstance(board.columns[0].cards, tuple)
+
+    def test_versions_share_unchanged_columns_and_cards(self):
+        board = Board()
+        column_1, column_2 = uuid4(), uuid4()
+        card_1, card_2 = uuid4(), uuid4()
+        board.add_column(column_1)
+        board.add_column(column_2)
+        board.add_card(column_1, card_1)
+        board.add_card(column_1, card_2)
+        before = board.columns
+
+        board.edit_card_title(column_1, card_2, "Changed")
+
+        self.assertIs(board.columns[1], before[1])
+        self.assertIs(board.columns[0].cards[0], before[0].cards[0])
+        self.assertEqual(before[0].cards[1].title, "")
+        self.assertEqual(board.columns[0].cards[1].title, "Changed")
+        self.assertEqual(board.columns[0].modified_version, board.version)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+
+from project_management.maintenance import compact_board, list_board_ids, read_archive, verify_board
+from project_management.project_management_app import ProjectManagementApp
+
+
+class TestHistoryCompactor(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.temp_dir.name, "events.db")
+        self.archive_path = os.path.join(self.temp_dir.name, "archive.ndjson")
+        self.app = ProjectManagementApp(env={"SQLITE_DBNAME": self.db_name})
+
+    def tearDown(self):
+        self.app.close()
+        self.temp_dir.cleanup()
+
+    def _compact(self, board_id, undo_horizon):
+        with open(self.archive_path, "a", encoding="utf-8") as archive_file:
+            return compact_board(self.app, board_id, undo_horizon, archive_file)
+
+    def _stored_versions(self, aggregate_id):
+        return [e.originator_version for e in self.app.events.recorder.select_events(aggregate_id)]
+
+    def test_compaction_folds_history_into_baseline(self):
+        board_id = self.app.create_board()
+        for i in range(20):
+            self.app.edit_board_title(board_id, f"Title {i}")
+        rendered_before = self.app.board_as_dict(board_id)
+
+        result = self._compact(board_id, undo_horizon=5)
+
+        self.assertEqual(result.baseline_version, 17)
+        self.assertEqual(self._stored_versions(board_id), [1] + list(range(17, 23)))
+        self.assertEqual(list_board_ids(self.app), [board_id])
+        self.assertEqual(self.app.board_as_dict(board_id), rendered_before)
+        self.assertEqual(verify_board(self.app, board_id), [])
+
+        archived = [r["originator_version"] for r in read_archive(self.archive_path)
+                    if r["originator_id"] == board_id and r["table"] == "stored_events"]
+        self.assertEqual(archived, list(range(2, 17)))
+
+    def test_diff_and_history_reject_compacted_versions(self):
+        board_id = self.app.create_board()
+        for i in range(20):
+            self.app.edit_board_title(board_id, f"Title {i}")
+        self._compact(board_id, undo_horizon=5)
+
+        with self.assertRaises(ValueError):
+            self.app.diff_board(board_id, 2)
+        with self.assertRaises(ValueError):
+            self.app.export_board_history(board_id, 2, 20)
+        with self.assertRaises(ValueError):
+            self.app.export_board_history(board_id, 1)
+
+        self.assertEqual(self.app.diff_board(board_id, 1, 17)["to_version"], 17)
+        exported = [json.loads(line)["version"] for line in self.app.export_board_history(board_id, 17, 18)]
+        self.assertEqual(exported, [17, 18])
+
+    def test_undo_stops_at_horizon(self):
+        board_id = self.app.create_board()
+        for i in range(10):
+            self.app.edit_board_title(board_id, f"Title {i}")
+        self._compact(board_id, undo_horizon=3)
+
+        for _ in range(10):
+            self.app.undo(board_id)
+        self.assertEqual(self.app.undo_redo_state_manager.get_version_cursor(board_id), 9)
+        self.assertEqual(self.app.board_as_dict(board_id)["board"]["title"], "Title 6")
+
+        self.app.redo(board_id)
+        self.assertEqual(self.app.board_as_dict(board_id)["board"]["title"], "Title 7")
+
+    def test_undo_commit_straddling_horizon_moves_baseline_to_commit(self):
+        board_id = self.app.create_board()
+        for i in range(5):
+            self.app.edit_board_title(board_id, f"Title {i}")
+        self.app.undo(board_id)
+        self.app.undo(board_id)
+        self.app.edit_board_title(board_id, "Branch")  # commits 8 -> 5
+        self.app.edit_board_title(board_id, "Branch 2")
+
+        result = self._compact(board_id, undo_horizon=3)
+        self.assertEqual(result.baseline_version, 8)
+
+        self.app.undo(board_id)
+        self.app.undo(board_id)
+        self.app.undo(board_id)
+        self.assertEqual(self.app.board_as_dict(board_id)["board"]["title"], "Title 2")
+        self.assertEqual(verify_board(self.app, board_id), [])
+
+    def test_nothing_beyond_horizon(self):
+        board_id = self.app.create_board()
+        self.app.edit_board_title(board_id, "Title")
+        result = self._compact(board_id, undo_horizon=10)
+        self.assertFalse(result.compacted)
+        self.assertEqual(self._stored_versions(board_id), [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
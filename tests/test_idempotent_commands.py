@@ -0,0 +1,130 @@
+import threading
+import unittest
+from uuid import uuid4
+
+from project_management.concurrency import RequestDeduplicator
+from project_management.rest_api import create_app
+
+
+class TestRequestDeduplicator(unittest.TestCase):
+
+    def test_runs_each_key_once_within_bound(self):
+        deduplicator = RequestDeduplicator(max_entries=2)
+        calls = []
+        for key in ("a", "a", "b", "c", "a"):
+            deduplicator.run(key, lambda: calls.append(key) or len(calls))
+        self.assertEqual(calls, ["a", "b", "c", "a"])
+        self.assertEqual(len(deduplicator), 2)
+
+    def test_failures_are_not_remembered(self):
+        deduplicator = RequestDeduplicator()
+
+        def fail():
+            raise RuntimeError("timeout")
+
+        with self.assertRaises(RuntimeError):
+            deduplicator.run("a", fail)
+        self.assertEqual(deduplicator.run("a", lambda: 1), 1)
+
+    def test_results_can_be_left_out(self):
+        deduplicator = RequestDeduplicator()
+        self.assertEqual(deduplicator.run("a", lambda: 400, remember=lambda status: status < 400), 400)
+        self.assertEqual(deduplicator.run("a", lambda: 201, remember=lambda status: status < 400), 201)
+        self.assertEqual(deduplicator.run("a", lambda: 500), 201)
+
+    def test_retry_waits_for_attempt_in_flight(self):
+        deduplicator = RequestDeduplicator()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "done"
+
+        first = threading.Thread(target=deduplicator.run, args=("a", slow))
+        first.start()
+        started.wait()
+        results = []
+        retry = threading.Thread(target=lambda: results.append(deduplicator.run("a", slow)))
+        retry.start()
+        release.set()
+        first.join()
+        retry.join()
+        self.assertEqual((calls, results), ([1], ["done"]))
+
+
+class TestIdempotentCommands(unittest.TestCase):
+
+    def setUp(self):
+        self.flask_app = create_app({"EVENTSOURCING_ENV": {"PERSISTENCE_MODULE": "eventsourcing.popo"}})
+        self.client = self.flask_app.test_client()
+        self.board_id = self.client.post('/create_board').get_json()["board_id"]
+
+    def board(self):
+        return self.client.get(f'/board_as_dict?board_id={self.board_id}').get_json()["board"]
+
+    def test_client_ids_and_request_ids(self):
+        column_id = str(uuid4())
+        payload = {"board_id": self.board_id, "column_id": column_id, "request_id": "add-column"}
+        first = self.client.post('/add_column_to_board', json=payload)
+        retry = self.client.post('/add_column_to_board', json=payload)
+        self.assertEqual((first.status_code, first.get_json()), (201, {"column_id": column_id}))
+        self.assertEqual((retry.status_code, retry.get_json()), (201, {"column_id": column_id}))
+
+        card_id = str(uuid4())
+        for request_id in ("add-card", "add-card-again"):
+            response = self.client.post('/add_card_to_column', json={
+                "board_id": self.board_id, "column_id": column_id, "card_id": card_id, "request_id": request_id})
+            self.assertEqual(response.get_json(), {"card_id": card_id})
+
+        board = self.board()
+        self.assertEqual([c["id"] for c in board["columns"]], [column_id])
+        self.assertEqual([c["id"] for c in board["columns"][0]["cards"]], [card_id])
+
+        version = board["version"]
+        for _ in range(2):
+            self.client.put('/edit_card_title', json={"board_id": self.board_id, "column_id": column_id,
+                                                      "card_id": card_id, "title": "Once", "request_id": "edit"})
+        self.assertEqual(self.board()["version"], version + 1)
+
+    def test_error_responses_are_not_replayed(self):
+        payload = {"board_id": self.board_id, "column_id": "not-a-uuid", "request_id": "add-column"}
+        self.assertEqual(self.client.post('/add_column_to_board', json=payload).status_code, 500)
+
+        column_id = str(uuid4())
+        response = self.client.post('/add_column_to_board', json={**payload, "column_id": column_id})
+        self.assertEqual((response.status_code, response.get_json()), (201, {"column_id": column_id}))
+
+    def test_pipelined_commands_to_one_board_do_not_conflict(self):
+        column_id = self.client.post('/add_column_to_board', json={"board_id": self.board_id}).get_json()["column_id"]
+        statuses = []
+
+        def add_cards():
+            client = self.flask_app.test_client()
+            for _ in range(10):
+                statuses.append(client.post('/add_card_to_column', json={
+                    "board_id": self.board_id, "column_id": column_id, "request_id": str(uuid4())}).status_code)
+
+        threads = [threading.Thread(target=add_cards) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(set(statuses), {201})
+        self.assertEqual(len(self.board()["columns"][0]["cards"]), 60)
+
+    def test_commands_on_removed_items_are_unprocessable(self):
+        column_id = self.client.post('/add_column_to_board', json={"board_id": self.board_id}).get_json()["column_id"]
+        card_id = self.client.post('/add_card_to_column', json={
+            "board_id": self.board_id, "column_id": column_id}).get_json()["card_id"]
+        self.client.delete('/remove_column_from_board', json={"board_id": self.board_id, "column_id": column_id})
+
+        response = self.client.put('/move_card', json={"board_id": self.board_id, "from_column_id": column_id,
+                                                       "to_column_id": column_id, "card_id": card_id,
+                                                       "new_index": 0})
+        self.assertEqual(response.status_code, 422)
+        response = self.client.put('/edit_column_title', json={"board_id": self.board_id, "column_id": column_id,
+                                                               "title": "Gone"})
+        self.assertEqual(response.status_code, 422)
@@ -0,0 +1,72 @@
+import argparse
+import random
+import threading
+import time
+import unittest
+from unittest import mock
+
+from benchmarks import load_generator
+
+
+class TestLoadGenerator(unittest.TestCase):
+
+    def test_report_percentiles_and_conflicts(self):
+        recorder = load_generator.LoadRecorder()
+        for i in range(1, 101):
+            recorder.record("/move_card", 409 if i <= 10 else 503 if i <= 15 else 200, i / 1000)
+        report = recorder.report(elapsed_seconds=2.0)
+
+        route = report["routes"]["/move_card"]
+        self.assertEqual(route["requests"], 100)
+        self.assertEqual(route["throughput_rps"], 50.0)
+        self.assertAlmostEqual(route["p50_ms"], 51.0)
+        self.assertAlmostEqual(route["p99_ms"], 99.0)
+        self.assertEqual(report["conflict_rate"], 0.1)
+        self.assertEqual(report["shed_rate"], 0.05)
+        self.assertEqual(route["errors"], 0)
+
+    def test_parse_users(self):
+        self.assertEqual(load_generator.parse_users("polling=3,typing"), {"polling": 3, "typing": 1})
+        with self.assertRaises(argparse.ArgumentTypeError):
+            load_generator.parse_users("scrolling=2")
+
+    def test_scenarios_wait_when_the_board_has_no_cards(self):
+        class EmptyBoardClient:
+            reads = 0
+
+            def board(self, board_id):
+                self.reads += 1
+                return None if self.reads % 2 else {"columns": [{"id": "column", "cards": []}]}
+
+        for scenario in (load_generator.drag_drop, load_generator.typing):
+            client, stop = EmptyBoardClient(), threading.Event()
+            user = threading.Thread(target=scenario, args=(client, "board", random.Random(0), stop),
+                                    kwargs={"retry_interval": 0.05})
+            user.start()
+            time.sleep(0.2)
+            stop.set()
+            user.join()
+            self.assertLessEqual(client.reads, 6)
+
+    def test_non_json_responses_are_recorded_as_errors(self):
+        recorder = load_generator.LoadRecorder()
+        client = load_generator.ApiClient("http://127.0.0.1:1", recorder)
+        for status, body in ((200, b"<html>Bad gateway</html>"), (502, b"<html>Bad gateway</html>")):
+            response = mock.MagicMock(status=status)
+            response.read.return_value = body
+            response.__enter__.return_value = response
+            with mock.patch("urllib.request.urlopen", return_value=response):
+                self.assertEqual(client.request("GET", "/board_as_dict"), (0 if status == 200 else 502, None))
+        self.assertEqual(recorder.report(elapsed_seconds=1.0)["error_rate"], 1.0)
+
+    def test_run_load_against_local_server(self):
+        with load_generator.local_server() as base_url:
+            report = load_generator.run_load(base_url, {"polling": 1, "drag_drop": 1, "typing": 1},
+                                             duration=1, columns=2, cards_per_column=2)
+        self.assertGreater(report["requests"], 0)
+        self.assertIn("/board_as_dict", report["routes"])
+        self.assertEqual(report["error_rate"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+from uuid import uuid4
+
+from project_management.memory import BoardSizeEstimator, MemoryGovernor, estimate_size
+from project_management.project_management_app import ProjectManagementApp
+from project_management.rest_api import create_app
+
+
+class TestMemoryGovernor(unittest.TestCase):
+
+    def test_size_aware_eviction_within_budget(self):
+        governor = MemoryGovernor(budget_bytes=100, eviction_window=3)
+        evicted = []
+        governor.register("cache", evicted.append)
+        governor.charge("cache", "small-1", "board-a", 10)
+        governor.charge("cache", "large", "board-b", 60)
+        governor.charge("cache", "small-2", "board-a", 10)
+        governor.touch("cache", "small-1")
+        governor.charge("cache", "small-3", "board-c", 30)
+
+        self.assertEqual(evicted, ["large"])
+        self.assertEqual(governor.used_bytes, 50)
+        self.assertEqual(governor.largest_boards(1), [("board-c", 30)])
+
+        governor.release("cache", "small-3")
+        self.assertEqual(governor.usage_by_cache(), {"cache": 20})
+        governor.charge("cache", "too-large", "board-d", 500)
+        self.assertIn("too-large", evicted)
+        self.assertLessEqual(governor.used_bytes, 100)
+
+    def test_board_size_estimate_tracks_deep_size(self):
+        app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.popo"})
+        board_id = app.import_board({"columns": [
+            {"title": "Column", "cards": [{"title": f"Card {i}", "content": "x" * i} for i in range(50)]}]})
+        board = app.repository.get(board_id)
+        estimate = BoardSizeEstimator().estimate(board)
+        self.assertGreater(estimate, estimate_size(board) * 0.8)
+        self.assertLess(estimate, estimate_size(board) * 1.5)
+
+    def test_column_sizes_are_remembered_per_board_least_recently_used_first(self):
+        app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.popo"})
+        column_id = uuid4()
+        board_ids = [app.create_board() for _ in range(3)]
+        for board_id in board_ids:
+            app.add_column(board_id, column_id)
+        card_id = app.add_card(board_ids[1], column_id)
+        app.edit_card_content(board_ids[1], column_id, card_id, "x" * 1000)
+        a, b, c = (app.repository.get(board_id) for board_id in board_ids)
+
+        estimator = BoardSizeEstimator(max_columns=2)
+        self.assertGreater(estimator.estimate(b), estimator.estimate(a) + 1000)
+        estimator.estimate(b)
+        estimator.estimate(c)
+        self.assertEqual([key[0] for key in estimator._column_sizes], [b.id, c.id])
+
+
+class TestCachedReads(unittest.TestCase):
+
+    def setUp(self):
+        self.app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.popo"})
+        self.board_id = self.app.create_board()
+        self.column_id = self.app.add_column(self.board_id)
+
+    def test_reads_follow_commands_and_undo(self):
+        self.app.edit_board_title(self.board_id, "First")
+        self.assertEqual(self.app.board_as_dict(self.board_id)["board"]["title"], "First")
+        self.app.edit_board_title(self.board_id, "Second")
+        self.app.undo(self.board_id)
+        self.assertEqual(self.app.board_as_dict(self.board_id)["board"]["title"], "First")
+        self.app.redo(self.board_id)
+        self.assertEqual(self.app.board_as_dict(self.board_id)["board"]["title"], "Second")
+
+        usage = self.app.memory_governor.usage_by_cache()
+        self.assertGreater(usage["boards"], 0)
+        self.assertGreater(usage["trackers"], 0)
+
+    def test_read_between_cursor_and_board_save_is_not_cached_as_newer(self):
+        board = self.app.repository.get(self.board_id)
+        self.app.undo_redo_state_manager.commit_undo_state(board)
+        board.edit_board_title("Saved late")
+        self.app.undo_redo_state_manager.increment_version_cursor(self.board_id)
+        self.assertEqual(self.app.board_as_dict(self.board_id)["board"]["title"], "")
+
+        self.app.save(board)
+        self.assertEqual(self.app.board_as_dict(self.board_id)["board"]["title"], "Saved late")
+
+    def test_tracker_cache_sees_saves_made_elsewhere(self):
+        self.app.board_as_dict(self.board_id)
+        tracker_id = self.app.repository.get(self.board_id).undo_redo_tracker_id
+        tracker = self.app.repository.get(tracker_id)
+        tracker.undo()
+        self.app.save(tracker)  # bypasses the cache
+        self.assertEqual(self.app.undo_redo_state_manager.get_version_cursor(self.board_id),
+                         tracker.get_version_cursor())
+
+    def test_tight_budget_keeps_reads_correct(self):
+        app = ProjectManagementApp(env={"PERSISTENCE_MODULE": "eventsourcing.popo", "CACHE_MEMORY_BUDGET": "2000"})
+        board_id = app.create_board()
+        column_id = app.add_column(board_id)
+        for i in range(20):
+            app.add_card(board_id, column_id)
+            self.assertEqual(len(app.board_as_dict(board_id)["board"]["columns"][0]["cards"]), i + 1)
+        self.assertLessEqual(app.memory_governor.used_bytes, 2000)
+        self.assertGreater(app.memory_governor.evictions, 0)
+
+    def test_admin_memory_endpoint(self):
+        flask_app = create_app({"EVENTSOURCING_ENV": {"PERSISTENCE_MODULE": "eventsourcing.popo"}})
+        client = flask_app.test_client()
+        board_ids = [client.post('/create_board').get_json()["board_id"] for _ in range(3)]
+        for board_id in board_ids:
+            client.get(f'/board_as_dict?board_id={board_id}')
+
+        report = client.get('/admin/memory?limit=2').get_json()
+        self.assertEqual(len(report["largest_boards"]), 2)
+        self.assertLessEqual(report["used_bytes"], report["budget_bytes"])
+        self.assertEqual(report["used_bytes"], sum(report["caches"].values()))
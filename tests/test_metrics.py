@@ -0,0 +1,52 @@
+import unittest
+
+from project_management.metrics import InstrumentedRepository, Metrics
+from project_management.project_management_app import ProjectManagementApp
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_disabled_metrics_record_nothing(self):
+        metrics = Metrics()
+        metrics.increment("requests_total")
+        metrics.observe("latency_seconds", 0.1)
+        with metrics.timer("latency_seconds"):
+            pass
+        self.assertEqual(metrics.render_prometheus(), "\n")
+
+        app = ProjectManagementApp(metrics=metrics)
+        self.assertNotIsInstance(app.repository, InstrumentedRepository)
+
+    def test_prometheus_rendering(self):
+        metrics = Metrics(enabled=True)
+        metrics.increment("requests_total", route="/undo")
+        metrics.observe("latency_seconds", 0.003, buckets=(0.001, 0.01))
+        self.assertEqual(metrics.render_prometheus().splitlines(), [
+            'requests_total{route="/undo"} 1',
+            'latency_seconds_bucket{le="0.001"} 0',
+            'latency_seconds_bucket{le="0.01"} 1',
+            'latency_seconds_bucket{le="+Inf"} 1',
+            'latency_seconds_sum 0.003',
+            'latency_seconds_count 1',
+        ])
+
+    def test_app_instrumentation(self):
+        metrics = Metrics(enabled=True)
+        app = ProjectManagementApp(metrics=metrics)
+        board_id = app.create_board()
+        app.edit_board_title(board_id, "Title 1")
+        app.edit_board_title(board_id, "Title 2")
+        app.undo(board_id)
+        app.edit_board_title(board_id, "Title 3")  # snapshots the undone state
+        app.board_as_dict(board_id)
+
+        self.assertGreater(metrics.counter_value("repository_get_total", aggregate="Board", snapshot="miss"), 0)
+        self.assertEqual(metrics.counter_value("repository_get_total", aggregate="Board", snapshot="hit"), 1)
+        self.assertGreater(metrics.histogram("repository_events_replayed", aggregate="Board").sum, 0)
+        self.assertGreater(metrics.histogram("undo_redo_tracker_load_seconds").count, 0)
+        self.assertGreater(metrics.counter_value("sqlite_transactions_total", kind="write"), 0)
+        self.assertGreater(metrics.counter_value("sqlite_transactions_total", kind="read"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
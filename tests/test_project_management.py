@@ -335,6 +335,43 @@ class TestProjectManagementApp(unittest.TestCase):
                          24,
                          "attempt to redo past the reference should jump to the commit + 1")
 
+    def test_clone_board(self):
+        source_id = self.app.create_board()
+        column_id = self.app.add_column(source_id)
+        card_id = self.app.add_card(source_id, column_id)
+        self.app.edit_board_title(source_id, "Template")
+        self.app.edit_card_title(source_id, column_id, card_id, "Checklist")
+
+        clone_id = self.app.clone_board(source_id)
+        clone_dict = self.app.board_as_dict(clone_id)
+        source_dict = self.app.board_as_dict(source_id)
+        self.assertNotEqual(clone_id, source_id)
+        self.assertEqual(clone_dict["board"]["title"], "Template")
+        self.assertEqual(clone_dict["board"]["columns"], source_dict["board"]["columns"])
+
+        # created, cloned and tracker linked, however large the source board is
+        self.assertEqual(clone_dict["board"]["version"], 3)
+
+        self.app.edit_card_title(clone_id, column_id, card_id, "Changed")
+        source_dict = self.app.board_as_dict(source_id)
+        self.assertEqual(source_dict["board"]["columns"][0]["cards"][0]["title"], "Checklist")
+
+    def test_clone_board_at_version(self):
+        source_id = self.app.create_board()
+        self.app.edit_board_title(source_id, "Title 1")
+        self.app.edit_board_title(source_id, "Title 2")
+        clone_id = self.app.clone_board(source_id, version=3)
+        self.assertEqual(self.app.board_as_dict(clone_id)["board"]["title"], "Title 1")
+
+    def test_clone_board_undo_stops_at_cloned_state(self):
+        source_id = self.app.create_board()
+        self.app.edit_board_title(source_id, "Template")
+        clone_id = self.app.clone_board(source_id)
+        self.app.edit_board_title(clone_id, "Copy")
+        self.app.undo(clone_id)
+        self.app.undo(clone_id)
+        self.assertEqual(self.app.board_as_dict(clone_id)["board"]["title"], "Template")
+
 
 if __name__ == "__main__":
     unittest.main()
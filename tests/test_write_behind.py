@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+
+from eventsourcing.sqlite import SQLiteProcessRecorder
+
+from project_management.persistence import WriteBehindError, WriteBehindFactory
+from project_management.persistence.write_behind import WriteBehindWriter
+from project_management.project_management_app import ProjectManagementApp
+
+
+class TestWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.sqlite_env = {
+            "PERSISTENCE_MODULE": "eventsourcing.sqlite",
+            "SQLITE_DBNAME": os.path.join(self.temp_dir.name, "events.db"),
+        }
+        self.env = {
+            **self.sqlite_env,
+            "PERSISTENCE_MODULE": "project_management.persistence:WriteBehindFactory",
+            "WRITE_BEHIND_INTERVAL": "3600",
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _edit(self, app, board_id):
+        column_id = app.add_column(board_id)
+        card_id = app.add_card(board_id, column_id)
+        app.edit_card_title(board_id, column_id, card_id, "First")
+        app.undo(board_id)
+        app.edit_card_title(board_id, column_id, card_id, "Second")
+        return column_id, card_id
+
+    def test_saves_are_written_behind(self):
+        app = ProjectManagementApp(env=self.env)
+        self.assertIsInstance(app.factory, WriteBehindFactory)
+        board_id = app.create_board()
+        self._edit(app, board_id)
+        writer = app.factory.writer
+        self.assertGreater(writer.pending_count, 0)
+
+        sqlite_app = ProjectManagementApp(env=self.sqlite_env)
+        self.assertEqual(list(sqlite_app.events.get(board_id)), [])
+
+        writer.flush()
+        self.assertEqual(writer.pending_count, 0)
+        self.assertEqual(sqlite_app.board_as_dict(board_id), app.board_as_dict(board_id))
+        sqlite_app.close()
+        app.close()
+
+    def test_restart_recovers_flushed_history(self):
+        app = ProjectManagementApp(env=self.env)
+        board_id = app.create_board()
+        self._edit(app, board_id)
+        expected = app.board_as_dict(board_id)
+        app.close()  # flushes what is pending
+
+        restarted = ProjectManagementApp(env=self.env)
+        self.assertEqual(restarted.board_as_dict(board_id), expected)
+        restarted.undo(board_id)
+        self.assertEqual(restarted.board_as_dict(board_id)["board"]["columns"][0]["cards"][0]["title"], "")
+        restarted.close()
+
+    def test_unflushed_writes_are_lost_as_a_whole(self):
+        app = ProjectManagementApp(env=self.env)
+        board_id = app.create_board()
+        app.factory.writer.flush()
+        self._edit(app, board_id)
+        self.assertGreater(app.factory.writer.discard(), 0)  # the process dies before the next flush
+        self.assertEqual(app.factory.writer.pending_count, 0)
+
+        restarted = ProjectManagementApp(env=self.env)
+        self.assertEqual(restarted.board_as_dict(board_id)["board"]["columns"], [])
+        restarted.edit_board_title(board_id, "Still consistent")
+        self.assertEqual(restarted.board_as_dict(board_id)["board"]["title"], "Still consistent")
+        restarted.close()
+
+    def test_process_recorder_writes_through_to_sqlite(self):
+        app = ProjectManagementApp(env=self.env)
+        recorder = app.factory.process_recorder()
+        self.assertIsInstance(recorder, SQLiteProcessRecorder)
+        self.assertEqual(recorder.max_tracking_id("upstream"), 0)
+        app.close()
+
+    def test_background_flush_within_interval(self):
+        app = ProjectManagementApp(env={**self.env, "WRITE_BEHIND_INTERVAL": "0.01"})
+        board_id = app.create_board()
+        writer = app.factory.writer
+        for _ in range(200):
+            if writer.pending_count == 0:
+                break
+            writer._thread.join(0.01)
+        self.assertEqual(writer.pending_count, 0)
+        app.close()
+
+    def test_writer_fails_after_repeated_flush_errors(self):
+        class BrokenDatastore:
+            def transaction(self, commit):
+                raise OSError("disk full")
+
+        writer = WriteBehindWriter(BrokenDatastore(), interval=0.001, max_pending=1, max_retries=2)
+        writer.enqueue(None, ["event"])
+        writer._thread.join(5)
+        self.assertFalse(writer._thread.is_alive())
+        for call in (writer.wait_for_capacity, writer.flush, lambda: writer.enqueue(None, ["event"])):
+            with self.assertRaises(WriteBehindError):
+                call()
+        self.assertEqual(writer.pending_count, 1)